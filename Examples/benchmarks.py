@@ -0,0 +1,83 @@
+from XRPLib.encoded_motor import EncodedMotor
+import time
+
+"""
+    Timing benchmarks for the hot paths used by the control loops.
+    Run these on the robot to see how long each operation takes, in microseconds.
+"""
+
+def _time_us(function, iterations):
+    start = time.ticks_us()
+    for _ in range(iterations):
+        function()
+    return time.ticks_diff(time.ticks_us(), start) / iterations
+
+# Compares the old way of reading an encoder (5 separate get() calls) against one 5-word get() into a signed buffer.
+# Run it with the wheel turned backwards too: negative counts made the old read allocate big ints
+def encoder_read_benchmark(iterations: int = 1000):
+    import gc
+    encoder = EncodedMotor.get_default_encoded_motor(index=1)._encoder
+    sm = encoder.sm
+
+    def legacy_read():
+        counts = sm.get()
+        counts = sm.get()
+        counts = sm.get()
+        counts = sm.get()
+        counts = sm.get()
+        if(counts > 2**31):
+            counts -= 2**32
+        return counts
+
+    def heap_used(function):
+        gc.collect()
+        free = gc.mem_free()
+        for _ in range(iterations):
+            function()
+        return (free - gc.mem_free()) / iterations
+
+    print(f"Encoder position: {encoder.get_position_counts()} counts")
+    for name, function in [("5x get()", legacy_read), ("one get(buffer)", encoder.get_position_counts)]:
+        print(f"Encoder read, {name + ':':17s} {_time_us(function, iterations):.1f} us, {heap_used(function):.1f} bytes allocated per read")
+
+# Compares the time and heap use of PID.update against FastPID's float and fixed-point updates
+def pid_benchmark(iterations: int = 1000):
+    import gc
+    from XRPLib.pid import PID
+    from XRPLib.fast_pid import FastPID
+    pid = PID(kp=0.0007, ki=0.0006, kd=0.0001)
+    fast = FastPID(kp=0.0007, ki=0.0006, kd=0.0001)
+
+    def heap_used(function):
+        gc.collect()
+        free = gc.mem_free()
+        for _ in range(iterations):
+            function()
+        return (free - gc.mem_free()) / iterations
+
+    tests = [
+        ("PID.update", lambda: pid.update(123.0, dt=0.02)),
+        ("FastPID.update", lambda: fast.update(123.0, 0.02)),
+        ("FastPID.update_fixed", lambda: fast.update_fixed(123, 20000)),
+    ]
+    for name, function in tests:
+        print(f"{name + ':':22s} {_time_us(function, iterations):.1f} us, {heap_used(function):.1f} bytes allocated per update")
+
+# Compares updating four separate PID objects against one four-channel ControllerBank
+def controller_bank_benchmark(iterations: int = 1000):
+    from XRPLib.pid import PID
+    from XRPLib.controller_bank import ControllerBank
+    pids = [PID(kp=0.0007, ki=0.0006) for _ in range(4)]
+    bank = ControllerBank(4)
+    for channel in range(4):
+        bank.configure(channel, kp=0.0007, ki=0.0006)
+        bank.errors[channel] = 123.0
+
+    def update_pids():
+        for pid in pids:
+            pid.update(123.0, dt=0.02)
+
+    separate = _time_us(update_pids, iterations)
+    banked = _time_us(lambda: bank.update(0.02), iterations)
+    print(f"4x PID.update:             {separate:.1f} us")
+    print(f"ControllerBank.update (4): {banked:.1f} us")
@@ -69,4 +69,36 @@ def test_drive():
 
     print("drive backwards 25 cm by setting distance negative")
     # There is no difference between setting speed or distance negative, both work
-    drivetrain.straight(-25,0.8)
\ No newline at end of file
+    drivetrain.straight(-25,0.8)
+
+# Drives forward while watching the rangefinder at the same time, stopping early if something gets close
+def straight_until_close(distance: float = 50, target_distance: float = 10.0):
+    import uasyncio as asyncio
+
+    async def main():
+        move = asyncio.create_task(drivetrain.straight_async(distance, 0.5))
+        while not move.done():
+            if rangefinder.distance() < target_distance:
+                # Cancelling the move stops the drivetrain
+                move.cancel()
+                print("Stopped early")
+            await asyncio.sleep(0.05)
+
+    asyncio.run(main())
+
+# Drives a rounded square without stopping at the corners, using a motion queue
+def rounded_square(side_length: float = 30, corner_radius: float = 10):
+    from XRPLib.motion_queue import MotionQueue
+    queue = MotionQueue(drivetrain)
+    queue.on_segment_done = lambda index: print("Finished segment", index)
+    for _ in range(4):
+        queue.straight(side_length)
+        queue.arc(corner_radius, 90)
+    queue.wait()
+
+# Measures this robot's real wheel diameter and track width, and saves them so the drivetrain uses them from then on.
+# Point the rangefinder at a wall about 60 cm away, with room to spin.
+def calibrate_drivetrain():
+    from XRPLib.drive_calibration import DriveCalibrator
+    wheel_diam, track_width = DriveCalibrator(drivetrain).run(rangefinder)
+    print(f"Wheel diameter: {wheel_diam:.2f} cm, track width: {track_width:.2f} cm")
@@ -0,0 +1,237 @@
+from .pid import PID
+from .timeout import Timeout
+import json
+import math
+import time
+
+class RelayAutotuner:
+
+    # PID tuning rules, as (kp / Ku, Ti / Tu, Td / Tu)
+    RULES = {
+        "ziegler-nichols": (0.6, 0.5, 0.125),
+        "tyreus-luyben": (1 / 2.2, 2.2, 1 / 6.3),
+        "no-overshoot": (0.2, 0.5, 1 / 3),
+    }
+
+    def __init__(self, relay_amplitude: float = 0.3, hysteresis: float = 0.0, cycles: int = 4, sample_period: float = 0.01, timeout: float = 15):
+        """
+        Tunes a PID loop with a relay (Astrom-Hagglund) experiment: the output is switched between two values whenever the error crosses zero,
+        which makes the system oscillate at its ultimate period. The size of that oscillation gives the ultimate gain,
+        and PID gains are derived from the two using a tuning rule.
+
+        :param relay_amplitude: How far above and below the bias the output switches (Bounded from 0 to 1 for efforts)
+        :type relay_amplitude: float
+        :param hysteresis: How far past zero the error has to go before the relay switches, to ignore noise
+        :type hysteresis: float
+        :param cycles: The number of oscillations to average over. The first one is always ignored as the system settles
+        :type cycles: int
+        :param sample_period: The time between samples, in seconds
+        :type sample_period: float
+        :param timeout: The amount of time before giving up on the experiment (In Seconds)
+        :type timeout: float
+        """
+        self.relay_amplitude = relay_amplitude
+        self.hysteresis = hysteresis
+        self.cycles = cycles
+        self.sample_period = sample_period
+        self.timeout = timeout
+
+        self.ultimate_gain = None
+        self.ultimate_period = None
+
+    def run(self, read_process, set_output, setpoint: float, bias: float = 0.0) -> bool:
+        """
+        Runs the relay experiment. The system is left with the output at the bias when finished.
+
+        :param read_process: Function returning the current value of the system being controlled
+        :type read_process: function
+        :param set_output: Function that applies an output to the system
+        :type set_output: function
+        :param setpoint: The value to oscillate around
+        :type setpoint: float
+        :param bias: The output centered on, e.g. the effort needed to hold the setpoint
+        :type bias: float
+        :return: if enough oscillations were measured before the timeout
+        :rtype: bool
+        """
+        time_out = Timeout(self.timeout)
+        relay_high = True
+        set_output(bias + self.relay_amplitude)
+
+        last_switch_time = None
+        peak_high = -math.inf
+        peak_low = math.inf
+        period_sum = 0
+        amplitude_sum = 0
+        measured = 0
+        # Oscillations are counted at each switch from low to high; the first one is still settling
+        switches = 0
+
+        while measured < self.cycles and not time_out.is_done():
+            value = read_process()
+            error = setpoint - value
+            peak_high = max(peak_high, value)
+            peak_low = min(peak_low, value)
+
+            if relay_high and error < -self.hysteresis:
+                relay_high = False
+                set_output(bias - self.relay_amplitude)
+            elif not relay_high and error > self.hysteresis:
+                relay_high = True
+                set_output(bias + self.relay_amplitude)
+                now = time.ticks_ms()
+                if switches >= 2:
+                    period_sum += time.ticks_diff(now, last_switch_time) / 1000
+                    amplitude_sum += (peak_high - peak_low) / 2
+                    measured += 1
+                switches += 1
+                last_switch_time = now
+                peak_high = -math.inf
+                peak_low = math.inf
+
+            time.sleep(self.sample_period)
+
+        set_output(bias)
+
+        if measured == 0:
+            return False
+        amplitude = amplitude_sum / measured
+        self.ultimate_period = period_sum / measured
+        self.ultimate_gain = 4 * self.relay_amplitude / (math.pi * amplitude) if amplitude > 0 else None
+        return self.ultimate_gain is not None and not time_out.is_done()
+
+    def get_gains(self, rule: str = "tyreus-luyben") -> tuple:
+        """
+        :param rule: The tuning rule to use: "ziegler-nichols" (fast, with overshoot), "tyreus-luyben" (less overshoot), or "no-overshoot"
+        :type rule: str
+        :return: The kp, ki and kd gains from the last experiment
+        :rtype: tuple<float>
+        """
+        if self.ultimate_gain is None:
+            raise Exception("Run the autotuner before getting gains!")
+        kp_ratio, ti_ratio, td_ratio = self.RULES[rule]
+        kp = kp_ratio * self.ultimate_gain
+        ki = kp / (ti_ratio * self.ultimate_period)
+        kd = kp * td_ratio * self.ultimate_period
+        return kp, ki, kd
+
+    def get_pid(self, rule: str = "tyreus-luyben", **kwargs) -> PID:
+        """
+        :param rule: The tuning rule to use, see get_gains
+        :type rule: str
+        :param kwargs: Any other PID parameters, such as max_output or tolerance
+        :return: A PID controller with the tuned gains
+        :rtype: PID
+        """
+        kp, ki, kd = self.get_gains(rule)
+        return PID(kp=kp, ki=ki, kd=kd, **kwargs)
+
+    def save(self, name: str, rule: str = "tyreus-luyben", path: str = "autotune.json"):
+        """
+        Saves the tuned gains to a file, so they can be loaded with load_pid on later runs
+
+        :param name: The name to save these gains under, e.g. "left_speed"
+        :type name: str
+        :param rule: The tuning rule to use, see get_gains
+        :type rule: str
+        :param path: The file to save to
+        :type path: str
+        """
+        try:
+            with open(path) as file:
+                saved = json.load(file)
+        except (OSError, ValueError):
+            saved = {}
+        kp, ki, kd = self.get_gains(rule)
+        saved[name] = {"kp": kp, "ki": ki, "kd": kd}
+        with open(path, "w") as file:
+            json.dump(saved, file)
+
+    @staticmethod
+    def load_pid(name: str, path: str = "autotune.json", **kwargs) -> PID:
+        """
+        Loads gains saved with save
+
+        :param name: The name the gains were saved under
+        :type name: str
+        :param path: The file they were saved to
+        :type path: str
+        :param kwargs: Any other PID parameters, such as max_output or tolerance
+        :return: A PID controller with the saved gains, or None if there are none saved under that name
+        :rtype: PID
+        """
+        try:
+            with open(path) as file:
+                gains = json.load(file)[name]
+        except (OSError, ValueError, KeyError):
+            return None
+        return PID(kp=gains["kp"], ki=gains["ki"], kd=gains["kd"], **kwargs)
+
+    def tune_speed(self, motor, target_rpm: float = 60, bias: float = 0.4, rule: str = "tyreus-luyben") -> PID:
+        """
+        Tunes a speed controller for an EncodedMotor, for use with set_speed_controller. The motor must be free to spin.
+
+        :param motor: The motor to tune
+        :type motor: EncodedMotor
+        :param target_rpm: The speed to oscillate around, in rpm
+        :type target_rpm: float
+        :param bias: An effort that roughly holds target_rpm
+        :type bias: float
+        :param rule: The tuning rule to use, see get_gains
+        :type rule: str
+        :return: The tuned controller, or None if the experiment failed
+        :rtype: PID
+        """
+        motor.set_speed()
+        # Speed control works in counts per second
+        setpoint = target_rpm * motor._resolution / 60
+        success = self.run(lambda: motor.speed, motor.set_effort, setpoint, bias)
+        motor.set_effort(0)
+        return self.get_pid(rule) if success else None
+
+    def tune_distance(self, drivetrain, rule: str = "tyreus-luyben") -> PID:
+        """
+        Tunes a distance controller for DifferentialDrive.straight. The robot rocks back and forth around where it started, so give it some room.
+
+        :param drivetrain: The drivetrain to tune
+        :type drivetrain: DifferentialDrive
+        :param rule: The tuning rule to use, see get_gains
+        :type rule: str
+        :return: The tuned controller, or None if the experiment failed
+        :rtype: PID
+        """
+        drivetrain.stop()
+        start_left, start_right = drivetrain.get_encoder_positions()
+
+        def distance():
+            left, right = drivetrain.get_encoder_positions()
+            return (left - start_left + right - start_right) / 2
+
+        success = self.run(distance, lambda effort: drivetrain.set_effort(effort, effort), 0)
+        drivetrain.stop()
+        return self.get_pid(rule, min_output=0.3, max_integral=10, tolerance=0.25, tolerance_count=3) if success else None
+
+    def tune_heading(self, drivetrain, rule: str = "tyreus-luyben") -> PID:
+        """
+        Tunes a heading controller for DifferentialDrive.turn. The robot rocks back and forth around its starting heading.
+        Uses the IMU if the drivetrain has one, otherwise the encoders.
+
+        :param drivetrain: The drivetrain to tune
+        :type drivetrain: DifferentialDrive
+        :param rule: The tuning rule to use, see get_gains
+        :type rule: str
+        :return: The tuned controller, or None if the experiment failed
+        :rtype: PID
+        """
+        drivetrain.stop()
+        start_left, start_right = drivetrain.get_encoder_positions()
+
+        def heading():
+            if drivetrain.imu is not None:
+                return drivetrain.imu.get_yaw()
+            left, right = drivetrain.get_encoder_positions()
+            return ((right - start_right) - (left - start_left)) / 2 * 360 / (drivetrain.track_width * math.pi)
+
+        success = self.run(heading, lambda effort: drivetrain.set_effort(-effort, effort), heading())
+        drivetrain.stop()
+        return self.get_pid(rule, min_output=0.1, max_integral=30, tolerance=1, tolerance_count=3) if success else None
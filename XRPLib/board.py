@@ -1,4 +1,5 @@
-from machine import Pin, ADC, Timer
+from machine import Pin, ADC
+from .scheduler import Scheduler
 import time
 
 class Board:
@@ -29,9 +30,8 @@ class Board:
         self.button = Pin(button_pin, Pin.IN, Pin.PULL_UP)
 
         self.led = Pin("LED", Pin.OUT)
-        # A timer ID of -1 is a virtual timer.
-        # Leaves the hardware timers for more important uses
-        self._virt_timer = Timer(-1)
+        # Blinking runs as a task on the shared scheduler
+        self._blink_task = None
         self.is_led_blinking = False
 
 
@@ -70,18 +70,16 @@ class Board:
         Turns the LED on
         Stops the blinking timer if it is running
         """
-        self.is_led_blinking = False
+        self._stop_blinking()
         self.led.on()
-        self._virt_timer.deinit()
 
     def led_off(self):
         """
         Turns the LED off
         Stops the blinking timer if it is running
         """
-        self.is_led_blinking = False
+        self._stop_blinking()
         self.led.off()
-        self._virt_timer.deinit()
 
     def led_blink(self, frequency: int=0):
         """
@@ -90,15 +88,18 @@ class Board:
         :param frequency: The frequency to blink the LED at (in Hz)
         :type frequency: int
         """
-        if self.is_led_blinking:
-            # disable the old timer so we can reinitialize it
-            self._virt_timer.deinit()
-        # We set it to twice in input frequency so that
+        # disable the old task so we can register a new one
+        self._stop_blinking()
+        # We toggle at twice the input frequency so that
         # the led flashes on and off frequency times per second
         if frequency != 0:
-            self._virt_timer.init(freq=frequency*2, mode=Timer.PERIODIC,
-                callback=lambda t:self.led.toggle())
+            # Rounded to 10ms so blinking doesn't force the shared scheduler to tick faster
+            period_ms = max(10, round(50 / frequency) * 10)
+            self._blink_task = Scheduler.get_default_scheduler().add_task(self.led.toggle, period_ms)
             self.is_led_blinking = True
-        else:
-            self._virt_timer.deinit()
-            self.is_led_blinking = False
+
+    def _stop_blinking(self):
+        if self._blink_task is not None:
+            Scheduler.get_default_scheduler().remove_task(self._blink_task)
+            self._blink_task = None
+        self.is_led_blinking = False
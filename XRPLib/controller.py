@@ -3,6 +3,13 @@ class Controller:
     An abstract class to be entended to demonstrate different types of control. A PID subclass has also been provided
     """
 
+    # Telemetry recorder, or None when not recording
+    telemetry = None
+
+    # True if update also takes a dt keyword argument, the time since the last update in seconds.
+    # Callers that know dt only pass it to controllers that set this, so update(self, input) overrides keep working
+    accepts_dt = False
+
     def update(self, input) -> float:
         """
         Handle a new update of this control loop given an effected input.
@@ -15,6 +22,16 @@ class Controller:
         """
         pass
 
+    def set_target(self, target: float):
+        """
+        Tells the controller the value it is trying to reach. Only controllers that use the setpoint directly
+        (such as feedforward) need this; the error passed to update is still what drives feedback.
+
+        :param target: The target value of the system being controlled
+        :type target: float
+        """
+        pass
+
     def is_done(self) -> bool:
         
         """
@@ -27,4 +44,14 @@ class Controller:
         """
         Clears all past data, such as integral sums or any other previous data
         """
-        pass
\ No newline at end of file
+        pass
+
+    def set_telemetry(self, telemetry = None):
+        """
+        Records every update of this controller into a Telemetry buffer, for controllers that support it (such as PID).
+        Call with no parameters to stop recording
+
+        :param telemetry: The buffer to record into, or None
+        :type telemetry: Telemetry
+        """
+        self.telemetry = telemetry
@@ -0,0 +1,160 @@
+from array import array
+from .controller import Controller
+from .fast_pid import update_channels, KP, KI, KD, MIN_OUTPUT, MAX_OUTPUT, MAX_INTEGRAL, TOLERANCE, INTEGRAL, PREV_ERROR, STRIDE
+import time
+
+"""
+Many PID channels updated together over packed arrays
+"""
+
+class ControllerBank:
+
+    def __init__(self, channels: int):
+        """
+        A bank of PID channels whose gains and state are packed into one array, so that all of them can be updated in a single call
+        without any per-object attribute lookups. Put errors into the errors array, call update, and read results from the outputs array.
+        Individual channels can also be used anywhere a Controller is accepted through channel(index).
+
+        :param channels: The number of PID channels
+        :type channels: int
+        """
+        self.channels = channels
+        self._state = array('f', [0] * (channels * STRIDE))
+        # 1 until a channel has had its first update, since it has no previous error for the derivative
+        self._first = bytearray([1] * channels)
+        self._times = array('i', [0] * channels)
+        self._tolerance_counts = array('i', [1] * channels)
+        self.errors = array('f', [0] * channels)
+        self.outputs = array('f', [0] * channels)
+        for i in range(channels):
+            self.configure(i)
+
+    def configure(self, channel: int, kp = 1.0, ki = 0.0, kd = 0.0, min_output = 0.0, max_output = 1.0, max_integral = None, tolerance = 0.1, tolerance_count = 1):
+        """
+        Sets the gains and limits of one channel, and clears its history. Parameters are the same as PID
+
+        :param channel: The index of the channel
+        :type channel: int
+        """
+        base = channel * STRIDE
+        s = self._state
+        s[base + KP] = kp
+        s[base + KI] = ki
+        s[base + KD] = kd
+        s[base + MIN_OUTPUT] = min_output
+        s[base + MAX_OUTPUT] = max_output
+        s[base + MAX_INTEGRAL] = 1e30 if max_integral is None else max_integral
+        s[base + TOLERANCE] = tolerance
+        self._tolerance_counts[channel] = tolerance_count
+        self.clear_channel(channel)
+
+    def set_max_output(self, channel: int, max_output: float):
+        """
+        :param channel: The index of the channel
+        :type channel: int
+        :param max_output: The new maximum output of that channel
+        :type max_output: float
+        """
+        self._state[channel * STRIDE + MAX_OUTPUT] = max_output
+
+    def update(self, dt: float, errors = None, outputs = None):
+        """
+        Updates every channel in one pass, e.g. once per scheduler tick
+
+        :param dt: The time since the last update, in seconds
+        :type dt: float
+        :param errors: The error of each channel. Defaults to this bank's errors array
+        :type errors: array<float>
+        :param outputs: Where to write the output of each channel. Defaults to this bank's outputs array
+        :type outputs: array<float>
+        """
+        update_channels(self._state, self._first, self._times, self.errors if errors is None else errors,
+                        self.outputs if outputs is None else outputs, dt, 0, self.channels)
+
+    def update_channel(self, channel: int, error: float, dt: float) -> float:
+        """
+        Updates one channel
+
+        :param channel: The index of the channel
+        :type channel: int
+        :param error: The error of that channel
+        :type error: float
+        :param dt: The time since the last update of that channel, in seconds
+        :type dt: float
+        :return: The output of that channel
+        :rtype: float
+        """
+        self.errors[channel] = error
+        update_channels(self._state, self._first, self._times, self.errors, self.outputs, dt, channel, channel + 1)
+        return self.outputs[channel]
+
+    def is_channel_done(self, channel: int) -> bool:
+        """
+        :param channel: The index of the channel
+        :type channel: int
+        :return: if that channel's error has been within tolerance for tolerance_count consecutive updates
+        :rtype: bool
+        """
+        return self._times[channel] >= self._tolerance_counts[channel]
+
+    def clear_channel(self, channel: int):
+        """
+        Clears the integral and previous error of one channel
+
+        :param channel: The index of the channel
+        :type channel: int
+        """
+        base = channel * STRIDE
+        self._state[base + INTEGRAL] = 0
+        self._state[base + PREV_ERROR] = 0
+        self._first[channel] = 1
+        self._times[channel] = 0
+        self.outputs[channel] = 0
+
+    def clear_history(self):
+        """
+        Clears the history of every channel
+        """
+        for channel in range(self.channels):
+            self.clear_channel(channel)
+
+    def channel(self, index: int):
+        """
+        :param index: The index of the channel
+        :type index: int
+        :return: A Controller that runs that channel, e.g. for EncodedMotor.set_speed_controller
+        :rtype: BankChannel
+        """
+        return BankChannel(self, index)
+
+
+class BankChannel(Controller):
+
+    accepts_dt = True
+
+    def __init__(self, bank: ControllerBank, index: int):
+        """
+        A single channel of a ControllerBank, usable anywhere a Controller is accepted
+
+        :param bank: The bank this channel belongs to
+        :type bank: ControllerBank
+        :param index: The index of the channel in that bank
+        :type index: int
+        """
+        self.bank = bank
+        self.index = index
+        self._prev_time = None
+
+    def update(self, error: float, dt: float = None) -> float:
+        if dt is None:
+            now = time.ticks_us()
+            dt = 0.01 if self._prev_time is None else time.ticks_diff(now, self._prev_time) / 1000000
+            self._prev_time = now
+        return self.bank.update_channel(self.index, error, dt)
+
+    def is_done(self) -> bool:
+        return self.bank.is_channel_done(self.index)
+
+    def clear_history(self):
+        self._prev_time = None
+        self.bank.clear_channel(self.index)
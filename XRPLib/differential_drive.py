@@ -1,8 +1,18 @@
 from .encoded_motor import EncodedMotor
+from .encoder import Encoder
+from .encoder_bank import EncoderBank
+from .motion_profile import MotionProfile
+from .odometry import Odometry
 from .imu import IMU
 from .controller import Controller
 from .pid import PID
 from .timeout import Timeout
+from .rate_limiter import RateLimiter
+from .drive_calibration import DriveCalibrator
+from .drive_move import DriveMove, StraightMove, TurnMove, ArcMove
+from .pure_pursuit import PurePursuit
+from .ramsete import RamseteFollower
+from .trajectory import Trajectory
 import time
 import math
 
@@ -23,6 +33,8 @@ class DifferentialDrive:
             EncodedMotor.get_default_encoded_motor(index=2),
             IMU.get_default_imu()
         )
+            # Use the wheel diameter and track width measured by DriveCalibrator, if it has been run on this robot
+            DriveCalibrator.load(cls._DEFAULT_DIFFERENTIAL_DRIVE_INSTANCE)
             
         return cls._DEFAULT_DIFFERENTIAL_DRIVE_INSTANCE
 
@@ -49,6 +61,23 @@ class DifferentialDrive:
         self.wheel_diam = wheel_diam
         self.track_width = wheel_track
 
+        # Sample both wheel encoders together so that straight() and turn() see consistent readings
+        self._encoder_bank = self._make_encoder_bank()
+
+        # Heading controller for curvature_drive, in cm/s of wheel speed difference per degree of heading error
+        self._curvature_controller = PID(
+            kp = 0.5,
+            max_output = 10,
+        )
+        self._curvature_heading = None
+        self._curvature_time = None
+
+        # Created by start_odometry, or the first time the pose is asked for
+        self.odometry = None
+
+        # Paces the control loops of blocking and async moves; its statistics describe the last move
+        self.loop_timer = RateLimiter(100)
+
     def set_effort(self, left_effort: float, right_effort: float) -> None:
         """
         Set the raw effort of both motors individually
@@ -83,6 +112,7 @@ class DifferentialDrive:
         self.left_motor.set_speed()
         self.right_motor.set_speed()
         self.set_effort(0,0)
+        self._curvature_time = None
 
     def arcade(self, straight:float, turn:float):
         """
@@ -108,6 +138,9 @@ class DifferentialDrive:
 
         self.left_motor.reset_encoder_position()
         self.right_motor.reset_encoder_position()
+        if self.odometry is not None:
+            # Keep the pose, measuring from the new zero
+            self.odometry.set_pose(*self.odometry.get_pose())
 
     def get_left_encoder_position(self) -> float:
         """
@@ -123,6 +156,108 @@ class DifferentialDrive:
         """
         return self.right_motor.get_position()*math.pi*self.wheel_diam
 
+    def get_encoder_positions(self) -> tuple:
+        """
+        Reads both encoders back-to-back, so the two positions are taken at the same instant.
+
+        :return: the current positions of the left and right motors' encoders in cm.
+        :rtype: tuple<float>
+        """
+        return self._read_encoder_positions(self._encoder_bank)
+
+    def _make_encoder_bank(self) -> EncoderBank:
+        """
+        Non-api method; creates a bank for reading both wheel encoders together, for get_encoder_positions and for background tasks
+        that need their own (see _read_encoder_positions). Motor groups don't have a single encoder, so they get None and fall back to separate reads
+        """
+        if hasattr(self.left_motor, "_encoder") and hasattr(self.right_motor, "_encoder"):
+            return EncoderBank(self.left_motor._encoder, self.right_motor._encoder)
+        return None
+
+    def _read_encoder_positions(self, bank: EncoderBank) -> tuple:
+        """
+        Non-api method; reads both wheel positions in cm from one snapshot of a bank made by _make_encoder_bank.
+        Tasks on the scheduler use their own bank, so that they can't replace the counts of a snapshot the main program is in the middle of.
+        The encoders themselves are still shared, so a read that gets interrupted by another read of the same encoder
+        returns that newer count, which is still a whole, valid count.
+        """
+        if bank is None:
+            return self.get_left_encoder_position(), self.get_right_encoder_position()
+        bank.update()
+        cm_per_count = math.pi * self.wheel_diam / Encoder.resolution
+        left = bank.counts[0] * cm_per_count
+        right = bank.counts[1] * cm_per_count
+        if self.left_motor._motor.flip_dir:
+            left = -left
+        if self.right_motor._motor.flip_dir:
+            right = -right
+        return left, right
+
+    def start_odometry(self, use_imu: bool = True, update_rate: float = 50) -> Odometry:
+        """
+        Starts tracking the robot's pose in the background, with the current position as the origin.
+        Restarts tracking if it was already running
+
+        :param use_imu: Whether to use the IMU for heading, if there is one
+        :type use_imu: bool
+        :param update_rate: How often the pose is updated, in Hz
+        :type update_rate: float
+        :return: The pose tracker
+        :rtype: Odometry
+        """
+        if self.odometry is not None:
+            self.odometry.stop()
+        self.odometry = Odometry(self, use_imu, update_rate)
+        return self.odometry
+
+    def get_pose(self) -> tuple:
+        """
+        Gets the robot's pose from background odometry. Tracking starts the first time this is called, from (0, 0) facing along the x axis
+
+        :return: The x and y position of the robot (In Centimeters) and its heading (In Degrees, counterclockwise positive)
+        :rtype: tuple<float>
+        """
+        if self.odometry is None:
+            self.start_odometry()
+        return self.odometry.get_pose()
+
+    def set_pose(self, x: float = 0, y: float = 0, heading: float = 0) -> None:
+        """
+        Sets where the robot currently is, starting odometry if it isn't running. Call with no parameters to make the current position the origin
+
+        :param x: The x position (In Centimeters)
+        :type x: float
+        :param y: The y position (In Centimeters)
+        :type y: float
+        :param heading: The heading (In Degrees, counterclockwise positive)
+        :type heading: float
+        """
+        if self.odometry is None:
+            self.start_odometry()
+        self.odometry.set_pose(x, y, heading)
+
+    def start_straight(self, distance: float, max_effort: float = 0.5, timeout: float = None, main_controller: Controller = None, secondary_controller: Controller = None) -> StraightMove:
+        """
+        Start going forward the specified distance in centimeters, without waiting for it to finish.
+        Call poll() on the returned move about every 10 ms until it returns False. Parameters are the same as straight
+
+        :return: The move, which can be polled or cancelled
+        :rtype: StraightMove
+        """
+        # ensure effort is always positive while distance could be either positive or negative
+        if max_effort < 0:
+            max_effort *= -1
+            distance *= -1
+
+        # Each move gets its own default controllers, so that moves running at the same time don't share state
+        if main_controller is None:
+            main_controller = self._make_straight_controller(max_effort)
+
+        # Secondary controller to keep encoder values in sync
+        if secondary_controller is None:
+            secondary_controller = self._make_straight_heading_controller()
+
+        return StraightMove(self, distance, main_controller, secondary_controller, timeout)
 
     def straight(self, distance: float, max_effort: float = 0.5, timeout: float = None, main_controller: Controller = None, secondary_controller: Controller = None) -> bool:
         """
@@ -142,71 +277,40 @@ class DifferentialDrive:
         :return: if the distance was reached before the timeout
         :rtype: bool
         """
-        # ensure effort is always positive while distance could be either positive or negative
-        if max_effort < 0:
-            max_effort *= -1
-            distance *= -1
+        return self._run_move(self.start_straight(distance, max_effort, timeout, main_controller, secondary_controller))
 
-        time_out = Timeout(timeout)
-        starting_left = self.get_left_encoder_position()
-        starting_right = self.get_right_encoder_position()
+    async def straight_async(self, distance: float, max_effort: float = 0.5, timeout: float = None, main_controller: Controller = None, secondary_controller: Controller = None) -> bool:
+        """
+        Awaitable version of straight, which lets other asyncio tasks run between control steps.
+        Cancelling the task stops the drivetrain. Parameters are the same as straight
 
+        :return: if the distance was reached before the timeout
+        :rtype: bool
+        """
+        return await self._run_move_async(self.start_straight(distance, max_effort, timeout, main_controller, secondary_controller))
+
+    def start_turn(self, turn_degrees: float, max_effort: float = 0.5, timeout: float = None, main_controller: Controller = None, secondary_controller: Controller = None, use_imu:bool = True) -> TurnMove:
+        """
+        Start turning the robot some relative heading given in turn_degrees, without waiting for it to finish.
+        Call poll() on the returned move about every 10 ms until it returns False. Parameters are the same as turn
+
+        :return: The move, which can be polled or cancelled
+        :rtype: TurnMove
+        """
+        if max_effort < 0:
+            max_effort = -max_effort
+            turn_degrees = -turn_degrees
 
         if main_controller is None:
-            main_controller = PID(
-                kp = 0.1,
-                ki = 0.04,
-                kd = 0.04,
-                min_output = 0.3,
-                max_output = max_effort,
-                max_integral = 10,
-                tolerance = 0.25,
-                tolerance_count = 3,
-            )
+            main_controller = self._make_turn_controller(max_effort)
 
         # Secondary controller to keep encoder values in sync
         if secondary_controller is None:
             secondary_controller = PID(
-                kp = 0.075, kd=0.001,
+                kp = 0.25,
             )
 
-        if self.imu is not None:
-            # record current heading to maintain it
-            initial_heading = self.imu.get_yaw()
-        else:
-            initial_heading = 0
-
-        while True:
-
-            # calculate the distance traveled
-            left_delta = self.get_left_encoder_position() - starting_left
-            right_delta = self.get_right_encoder_position() - starting_right
-            dist_traveled = (left_delta + right_delta) / 2
-
-            # PID for distance
-            distance_error = distance - dist_traveled
-            effort = main_controller.update(distance_error)
-            
-            if main_controller.is_done() or time_out.is_done():
-                break
-
-            # calculate heading correction
-            if self.imu is not None:
-                # record current heading to maintain it
-                current_heading = self.imu.get_yaw()
-            else:
-                current_heading = ((right_delta-left_delta)/2)*360/(self.track_width*math.pi)
-
-            headingCorrection = secondary_controller.update(initial_heading - current_heading)
-            
-            self.set_effort(effort - headingCorrection, effort + headingCorrection)
-
-            time.sleep(0.01)
-
-        self.stop()
-
-        return not time_out.is_done()
-
+        return TurnMove(self, turn_degrees, main_controller, secondary_controller, timeout, use_imu)
 
     def turn(self, turn_degrees: float, max_effort: float = 0.5, timeout: float = None, main_controller: Controller = None, secondary_controller: Controller = None, use_imu:bool = True) -> bool:
         """
@@ -229,64 +333,301 @@ class DifferentialDrive:
         :return: if the distance was reached before the timeout
         :rtype: bool
         """
+        return self._run_move(self.start_turn(turn_degrees, max_effort, timeout, main_controller, secondary_controller, use_imu))
+
+    async def turn_async(self, turn_degrees: float, max_effort: float = 0.5, timeout: float = None, main_controller: Controller = None, secondary_controller: Controller = None, use_imu:bool = True) -> bool:
+        """
+        Awaitable version of turn, which lets other asyncio tasks run between control steps.
+        Cancelling the task stops the drivetrain. Parameters are the same as turn
+
+        :return: if the turn was completed before the timeout
+        :rtype: bool
+        """
+        return await self._run_move_async(self.start_turn(turn_degrees, max_effort, timeout, main_controller, secondary_controller, use_imu))
+
+    def start_arc(self, radius: float, angle: float, max_effort: float = 0.5, timeout: float = None, main_controller: Controller = None, secondary_controller: Controller = None, use_imu:bool = True) -> ArcMove:
+        """
+        Start driving along an arc, without waiting for it to finish.
+        Call poll() on the returned move about every 10 ms until it returns False. Parameters are the same as arc
 
+        :return: The move, which can be polled or cancelled
+        :rtype: ArcMove
+        """
         if max_effort < 0:
             max_effort = -max_effort
-            turn_degrees = -turn_degrees
-
-        time_out = Timeout(timeout)
-        starting_left = self.get_left_encoder_position()
-        starting_right = self.get_right_encoder_position()
+            angle = -angle
 
         if main_controller is None:
-            main_controller = PID(
-                # kp = 0.2,
-                # ki = 0.004,
-                # kd = 0.0036,
-                kd = 0.0036 + 0.0034 * (max(max_effort, 0.5) - 0.5) * 2,
-                kp = 0.2,
-                ki = 0.004,
-                #kd = 0.007,
-                min_output = 0.1,
-                max_output = max_effort,
-                max_integral = 30,
-                tolerance = 1,
-                tolerance_count = 3
-            )
+            main_controller = self._make_straight_controller(max_effort)
 
-        # Secondary controller to keep encoder values in sync
         if secondary_controller is None:
-            secondary_controller = PID(
-                kp = 0.25,
-            )
- 
-        if use_imu and (self.imu is not None):
-            turn_degrees += self.imu.get_yaw()
+            secondary_controller = self._make_straight_heading_controller()
 
-        while True:
-            
-            # calculate encoder correction to minimize drift
-            left_delta = self.get_left_encoder_position() - starting_left
-            right_delta = self.get_right_encoder_position() - starting_right
-            encoder_correction = secondary_controller.update(left_delta + right_delta)
-
-            if use_imu and (self.imu is not None):
-                # calculate turn error (in degrees) from the imu
-                turn_error = turn_degrees - self.imu.get_yaw()
+        return ArcMove(self, radius, angle, main_controller, secondary_controller, timeout, use_imu)
+
+    def arc(self, radius: float, angle: float, max_effort: float = 0.5, timeout: float = None, main_controller: Controller = None, secondary_controller: Controller = None, use_imu:bool = True) -> bool:
+        """
+        Drive along an arc of the given radius, and exit function when the robot has gone the given angle around it.
+        The wheels are driven in the ratio the arc needs, and the heading is held to where it should be at each point along the arc.
+        A radius of 0 is a turn in place, which raises ValueError; use turn for that.
+
+        :param radius: The radius of the arc, measured to the center of the robot (In Centimeters). Positive curves left, negative curves right
+        :type radius: float
+        :param angle: How far around the circle to drive (In Degrees). Negative drives backwards along the same circle
+        :type angle: float
+        :param max_effort: The max effort of the outer wheel (Bounded from -1 to 1). Negative drives backwards
+        :type max_effort: float
+        :param timeout: The amount of time before the robot stops trying to drive the arc and continues to the next step (In Seconds)
+        :type timeout: float
+        :param main_controller: The main controller, for handling the distance driven along the arc
+        :type main_controller: Controller
+        :param secondary_controller: The secondary controller, for keeping the heading on the arc
+        :type secondary_controller: Controller
+        :param use_imu: A boolean flag that changes if heading is measured with the imu (True) or the encoders (False)
+        :type use_imu: bool
+        :return: if the end of the arc was reached before the timeout
+        :rtype: bool
+        """
+        return self._run_move(self.start_arc(radius, angle, max_effort, timeout, main_controller, secondary_controller, use_imu))
+
+    async def arc_async(self, radius: float, angle: float, max_effort: float = 0.5, timeout: float = None, main_controller: Controller = None, secondary_controller: Controller = None, use_imu:bool = True) -> bool:
+        """
+        Awaitable version of arc, which lets other asyncio tasks run between control steps.
+        Cancelling the task stops the drivetrain. Parameters are the same as arc
+
+        :return: if the end of the arc was reached before the timeout
+        :rtype: bool
+        """
+        return await self._run_move_async(self.start_arc(radius, angle, max_effort, timeout, main_controller, secondary_controller, use_imu))
+
+    def curvature_drive(self, speed: float, curvature: float, controller: Controller = None) -> None:
+        """
+        Drive at a speed along a curve, like arcade but with the curve given geometrically so that it doesn't change with speed.
+        Meant to be called repeatedly in a loop: each wheel's speed is held by its encoder, and with an IMU, the heading is held
+        to where the curve says it should be since the previous calls. Call stop, or pass a speed of 0, to end.
+
+        :param speed: The speed of the center of the robot (In Centimeters per Second). Negative drives backwards
+        :type speed: float
+        :param curvature: How sharply to curve (In 1/Centimeters), which is 1 / the turning radius. Positive curves left, 0 drives straight
+        :type curvature: float
+        :param controller: The controller for holding heading, given the heading error in degrees and returning a wheel speed difference in cm/s
+        :type controller: Controller
+        """
+        if speed == 0:
+            self.stop()
+            return
+        if controller is None:
+            controller = self._curvature_controller
+
+        correction = 0
+        if self.imu is not None:
+            now = time.ticks_ms()
+            if self._curvature_time is None or time.ticks_diff(now, self._curvature_time) > 500:
+                # Starting fresh, or it's been too long since the last call to say where the heading should be
+                self._curvature_heading = self.imu.get_yaw()
+                controller.clear_history()
             else:
-                # calculate turn error (in degrees) from the encoder counts
-                turn_error = turn_degrees - ((right_delta-left_delta)/2)*360/(self.track_width*math.pi)
+                dt = time.ticks_diff(now, self._curvature_time) / 1000
+                self._curvature_heading += math.degrees(speed * curvature * dt)
+            self._curvature_time = now
+            correction = controller.update(self._curvature_heading - self.imu.get_yaw())
 
-            # Pass the turn error to the main controller to get a turn speed
-            turn_speed = main_controller.update(turn_error)
+        half_track = self.track_width / 2
+        self.set_speed(speed * (1 - curvature * half_track) - correction, speed * (1 + curvature * half_track) + correction)
 
-            # exit if timeout or tolerance reached
-            if main_controller.is_done() or time_out.is_done():
-                break
+    def follow_path(self, waypoints: list, speed: float = 20, lookahead: float = 15, max_acceleration: float = 40, tolerance: float = 1, timeout: float = None) -> bool:
+        """
+        Drive smoothly through a list of (x, y) waypoints with pure pursuit, without stopping at each one, and exit function when the end is reached.
+        Positions are in the frame of get_pose, and the path starts from where the robot is. Uses speed control, so the motors' speed controllers should be tuned.
+
+        :param waypoints: The points to drive through (In Centimeters)
+        :type waypoints: list<tuple<float>>
+        :param speed: The cruising speed (In Centimeters per Second)
+        :type speed: float
+        :param lookahead: How far ahead along the path to steer towards (In Centimeters). Larger is smoother, smaller follows corners more tightly
+        :type lookahead: float
+        :param max_acceleration: How fast to slow down for the end of the path (In Centimeters per Second squared)
+        :type max_acceleration: float
+        :param tolerance: How close to the end of the path counts as finished (In Centimeters)
+        :type tolerance: float
+        :param timeout: The amount of time before the robot stops trying to follow the path and continues to the next step (In Seconds)
+        :type timeout: float
+        :return: if the end of the path was reached before the timeout
+        :rtype: bool
+        """
+        return self._run_move(PurePursuit(self, waypoints, speed, lookahead, max_acceleration, tolerance, timeout))
+
+    async def follow_path_async(self, waypoints: list, speed: float = 20, lookahead: float = 15, max_acceleration: float = 40, tolerance: float = 1, timeout: float = None) -> bool:
+        """
+        Awaitable version of follow_path, which lets other asyncio tasks run between control steps.
+        Cancelling the task stops the drivetrain. Parameters are the same as follow_path
+
+        :return: if the end of the path was reached before the timeout
+        :rtype: bool
+        """
+        return await self._run_move_async(PurePursuit(self, waypoints, speed, lookahead, max_acceleration, tolerance, timeout))
+
+    def follow_trajectory(self, trajectory: Trajectory, b: float = 0.0002, zeta: float = 0.7, relative: bool = True, timeout: float = None) -> bool:
+        """
+        Follow a precomputed trajectory with RAMSETE feedback, and exit function when the trajectory is over.
+        Uses speed control, so the motors' speed controllers should be tuned.
+
+        :param trajectory: The trajectory to follow, e.g. from Trajectory.from_waypoints or Trajectory.load
+        :type trajectory: Trajectory
+        :param b: How aggressively to correct errors, in 1/cm^2
+        :type b: float
+        :param zeta: Damping of the correction, from 0 to 1
+        :type zeta: float
+        :param relative: If True, the trajectory starts from the robot's current pose. If False, it is in the frame of get_pose
+        :type relative: bool
+        :param timeout: The amount of time before the robot stops trying to follow the trajectory and continues to the next step (In Seconds)
+        :type timeout: float
+        :return: if the trajectory was finished before the timeout
+        :rtype: bool
+        """
+        return self._run_move(RamseteFollower(self, trajectory, b, zeta, relative, timeout))
+
+    async def follow_trajectory_async(self, trajectory: Trajectory, b: float = 0.0002, zeta: float = 0.7, relative: bool = True, timeout: float = None) -> bool:
+        """
+        Awaitable version of follow_trajectory, which lets other asyncio tasks run between control steps.
+        Cancelling the task stops the drivetrain. Parameters are the same as follow_trajectory
+
+        :return: if the trajectory was finished before the timeout
+        :rtype: bool
+        """
+        return await self._run_move_async(RamseteFollower(self, trajectory, b, zeta, relative, timeout))
 
-            self.set_effort(-turn_speed - encoder_correction, turn_speed - encoder_correction)
+    def _run_move(self, move: DriveMove) -> bool:
+        """
+        Non-api method; polls a move until it finishes
+        """
+        self.loop_timer.start()
+        try:
+            while move.poll():
+                self.loop_timer.wait()
+        finally:
+            # Stop the motors even if the move is interrupted, e.g. by a KeyboardInterrupt
+            move.cancel()
+        return move.reached
+
+    async def _run_move_async(self, move: DriveMove) -> bool:
+        """
+        Non-api method; polls a move until it finishes, yielding to other tasks between steps
+        """
+        self.loop_timer.start()
+        try:
+            while move.poll():
+                await self.loop_timer.wait_async()
+        finally:
+            # Runs when the task is cancelled too, so the robot never keeps driving on its own
+            move.cancel()
+        return move.reached
+
+    def profiled_straight(self, distance: float, max_speed: float = 30, max_acceleration: float = 60, max_jerk: float = None, timeout: float = None) -> bool:
+        """
+        Go forward the specified distance in centimeters by following a precomputed motion profile, and exit function when the profile is finished.
+        Both wheels follow the profile in the background speed control loop, which gives smooth starts and stops without overshoot.
 
-            time.sleep(0.01)
+        :param distance: The distance for the robot to travel (In Centimeters)
+        :type distance: float
+        :param max_speed: The cruising speed (In Centimeters per Second)
+        :type max_speed: float
+        :param max_acceleration: The acceleration and deceleration (In Centimeters per Second squared)
+        :type max_acceleration: float
+        :param max_jerk: If given, use an S-curve profile that limits how fast acceleration changes (In Centimeters per Second cubed)
+        :type max_jerk: float
+        :param timeout: The amount of time before the robot stops trying to move forward and continues to the next step (In Seconds)
+        :type timeout: float
+        :return: if the distance was reached before the timeout
+        :rtype: bool
+        """
+        profile = self._make_profile(distance, max_speed, max_acceleration, max_jerk)
+        revs_per_cm = 1 / (math.pi * self.wheel_diam)
+        return self._follow_profile(profile, revs_per_cm, revs_per_cm, timeout)
+
+    def profiled_turn(self, turn_degrees: float, max_speed: float = 90, max_acceleration: float = 180, max_jerk: float = None, timeout: float = None) -> bool:
+        """
+        Turn the robot some relative heading given in turn_degrees by following a precomputed motion profile, and exit function when the profile is finished.
+        The turn is measured with the encoders, so it relies on the track width being accurate.
+
+        :param turn_degrees: The number of angle for the robot to turn (In Degrees)
+        :type turn_degrees: float
+        :param max_speed: The cruising turn rate (In Degrees per Second)
+        :type max_speed: float
+        :param max_acceleration: The angular acceleration and deceleration (In Degrees per Second squared)
+        :type max_acceleration: float
+        :param max_jerk: If given, use an S-curve profile that limits how fast acceleration changes (In Degrees per Second cubed)
+        :type max_jerk: float
+        :param timeout: The amount of time before the robot stops trying to turn and continues to the next step (In Seconds)
+        :type timeout: float
+        :return: if the turn was completed before the timeout
+        :rtype: bool
+        """
+        profile = self._make_profile(turn_degrees, max_speed, max_acceleration, max_jerk)
+        # Each wheel travels along the circle the robot turns on, in opposite directions
+        revs_per_degree = (self.track_width * math.pi / 360) / (math.pi * self.wheel_diam)
+        return self._follow_profile(profile, -revs_per_degree, revs_per_degree, timeout)
+
+    def _make_straight_controller(self, max_effort: float) -> PID:
+        """
+        Non-api method; creates the default distance controller for straight and arc moves
+        """
+        return PID(
+            kp = 0.1,
+            ki = 0.04,
+            kd = 0.04,
+            min_output = 0.3,
+            max_output = max_effort,
+            max_integral = 10,
+            tolerance = 0.25,
+            tolerance_count = 3,
+            derivative_on_measurement = True,
+            derivative_filter = 0.02,
+            # About ki/kp; much more drives the integral negative while the output is saturated, and the end of the move crawls
+            anti_windup_gain = 0.4,
+        )
+
+    def _make_straight_heading_controller(self) -> PID:
+        """
+        Non-api method; creates the default heading controller for straight and arc moves
+        """
+        return PID(
+            kp = 0.075, kd=0.001,
+        )
+
+    def _make_turn_controller(self, max_effort: float) -> PID:
+        """
+        Non-api method; creates the default angle controller for turns
+        """
+        return PID(
+            kp = 0.2,
+            ki = 0.004,
+            kd = 0.005,
+            min_output = 0.1,
+            max_output = max_effort,
+            max_integral = 30,
+            tolerance = 1,
+            tolerance_count = 3,
+            derivative_on_measurement = True,
+            derivative_filter = 0.02,
+            anti_windup_gain = 10,
+        )
+
+    def _make_profile(self, distance: float, max_speed: float, max_acceleration: float, max_jerk: float) -> MotionProfile:
+        if max_jerk is None:
+            return MotionProfile.trapezoidal(distance, max_speed, max_acceleration)
+        return MotionProfile.s_curve(distance, max_speed, max_acceleration, max_jerk)
+
+    def _follow_profile(self, profile: MotionProfile, left_scale: float, right_scale: float, timeout: float) -> bool:
+        time_out = Timeout(timeout)
+        self.left_motor.follow_profile(profile, left_scale)
+        self.right_motor.follow_profile(profile, right_scale)
+
+        self.loop_timer.start()
+        while not (self.left_motor.is_done() and self.right_motor.is_done()):
+            if time_out.is_done():
+                break
+            self.loop_timer.wait()
 
         self.stop()
 
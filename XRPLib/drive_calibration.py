@@ -0,0 +1,193 @@
+from .timeout import Timeout
+import json
+import math
+import time
+
+class DriveCalibrator:
+
+    def __init__(self, drivetrain, effort: float = 0.5, settle_time: float = 0.5):
+        """
+        Measures the effective wheel diameter and track width of a drivetrain, which are rarely the nominal values
+        because of tire squish and where the wheels actually touch the ground.
+
+        The track width comes from spinning in place and comparing how far the wheels went with how far the IMU says the robot turned.
+        The wheel diameter needs a distance the encoders can't measure themselves, so it comes from driving straight at a wall
+        and measuring the distance to it with the rangefinder before and after.
+
+        :param drivetrain: The drivetrain to calibrate. It must have an IMU
+        :type drivetrain: DifferentialDrive
+        :param effort: The effort to spin and drive at
+        :type effort: float
+        :param settle_time: How long to wait after stopping before taking readings, in seconds
+        :type settle_time: float
+        """
+        if drivetrain.imu is None:
+            raise Exception("Drivetrain calibration needs an IMU")
+        self.drivetrain = drivetrain
+        self.effort = effort
+        self.settle_time = settle_time
+
+        self.wheel_diam = drivetrain.wheel_diam
+        self.track_width = drivetrain.track_width
+        # Track width measured in wheel diameters, once the spin calibration has run
+        self._track_per_diam = None
+
+    def run(self, rangefinder = None, turns: float = 2, distance: float = 40, save: bool = True, path: str = "drive_geometry.json") -> tuple:
+        """
+        Calibrates the drivetrain and applies the result to it. Give the robot room to spin, and if using the rangefinder,
+        point it straight at a flat wall at least distance + 15 cm away.
+
+        :param rangefinder: The rangefinder, to calibrate the wheel diameter. If None, only the track width is calibrated
+        :type rangefinder: Rangefinder
+        :param turns: How many full turns to spin in each direction. More turns averages out more error
+        :type turns: float
+        :param distance: How far to drive towards the wall (In Centimeters)
+        :type distance: float
+        :param save: Whether to save the result, so that the default drivetrain loads it on later runs
+        :type save: bool
+        :param path: The file to save to
+        :type path: str
+        :return: The effective wheel diameter and track width (In Centimeters)
+        :rtype: tuple<float>
+        """
+        if rangefinder is not None:
+            self.calibrate_wheel_diameter(rangefinder, distance)
+        self.calibrate_track_width(turns)
+        self.apply()
+        if save:
+            self.save(path)
+        return self.wheel_diam, self.track_width
+
+    def calibrate_track_width(self, turns: float = 2) -> float:
+        """
+        Spins in place both ways and works out the track width from how far the wheels went per radian the IMU measured.
+        Spinning both ways cancels out any bias in the IMU
+
+        :param turns: How many full turns to spin in each direction
+        :type turns: float
+        :return: The effective track width (In Centimeters), in terms of the current wheel diameter estimate
+        :rtype: float
+        """
+        ratios = [self._spin(360 * turns), self._spin(-360 * turns)]
+        # Measured in wheel revolutions, so it stays correct if the wheel diameter is calibrated afterwards
+        self._track_per_diam = sum(ratios) / len(ratios)
+        self.track_width = self._track_per_diam * self.wheel_diam
+        return self.track_width
+
+    def calibrate_wheel_diameter(self, rangefinder, distance: float = 40) -> float:
+        """
+        Drives straight at a wall, holding heading with the IMU, and compares how far the rangefinder says the robot went with how far the wheels turned
+
+        :param rangefinder: The rangefinder, pointed at a flat wall
+        :type rangefinder: Rangefinder
+        :param distance: How far to drive (In Centimeters)
+        :type distance: float
+        :return: The effective wheel diameter (In Centimeters)
+        :rtype: float
+        """
+        drivetrain = self.drivetrain
+        before = self._measure_wall(rangefinder)
+        start_left, start_right = self._read_revolutions()
+        drivetrain.straight(distance, self.effort)
+        time.sleep(self.settle_time)
+        end_left, end_right = self._read_revolutions()
+        after = self._measure_wall(rangefinder)
+
+        revolutions = ((end_left - start_left) + (end_right - start_right)) / 2
+        if revolutions <= 0 or before <= after:
+            raise Exception("Wheel diameter calibration failed; is the rangefinder pointed at a wall?")
+        self.wheel_diam = (before - after) / (math.pi * revolutions)
+        if self._track_per_diam is not None:
+            self.track_width = self._track_per_diam * self.wheel_diam
+        return self.wheel_diam
+
+    def apply(self):
+        """
+        Sets the drivetrain's wheel diameter and track width to the calibrated values
+        """
+        self.drivetrain.wheel_diam = self.wheel_diam
+        self.drivetrain.track_width = self.track_width
+
+    def save(self, path: str = "drive_geometry.json"):
+        """
+        Saves the calibrated values, so they can be loaded with load on later runs
+
+        :param path: The file to save to
+        :type path: str
+        """
+        with open(path, "w") as file:
+            json.dump({"wheel_diam": self.wheel_diam, "track_width": self.track_width}, file)
+
+    @staticmethod
+    def load(drivetrain, path: str = "drive_geometry.json") -> bool:
+        """
+        Applies values saved with save to a drivetrain
+
+        :param drivetrain: The drivetrain to apply them to
+        :type drivetrain: DifferentialDrive
+        :param path: The file they were saved to
+        :type path: str
+        :return: if values were found and applied
+        :rtype: bool
+        """
+        try:
+            with open(path) as file:
+                geometry = json.load(file)
+            wheel_diam = geometry["wheel_diam"]
+            track_width = geometry["track_width"]
+        except (OSError, ValueError, KeyError):
+            return False
+        drivetrain.wheel_diam = wheel_diam
+        drivetrain.track_width = track_width
+        return True
+
+    def _spin(self, degrees: float) -> float:
+        """
+        Non-api method; spins in place by about the given angle
+
+        :return: The track width divided by the wheel diameter, from this spin
+        """
+        drivetrain = self.drivetrain
+        imu = drivetrain.imu
+        start_yaw = imu.get_yaw()
+        start_left, start_right = self._read_revolutions()
+
+        direction = 1 if degrees > 0 else -1
+        time_out = Timeout(abs(degrees) / 90 + 10)
+        drivetrain.set_effort(-direction * self.effort, direction * self.effort)
+        while abs(imu.get_yaw() - start_yaw) < abs(degrees) and not time_out.is_done():
+            time.sleep(0.01)
+        drivetrain.stop()
+        time.sleep(self.settle_time)
+
+        # Whatever the robot coasted is counted by both the IMU and the encoders, so it doesn't matter where it stopped
+        turned = math.radians(imu.get_yaw() - start_yaw)
+        end_left, end_right = self._read_revolutions()
+        if abs(turned) < math.pi:
+            raise Exception("Track width calibration failed; the robot didn't turn")
+        # Each wheel travels half the track width per radian, in opposite directions
+        return ((end_right - start_right) - (end_left - start_left)) * math.pi / turned
+
+    def _read_revolutions(self) -> tuple:
+        """
+        Non-api method; reads both wheel positions in revolutions
+        """
+        left, right = self.drivetrain.get_encoder_positions()
+        circumference = math.pi * self.drivetrain.wheel_diam
+        return left / circumference, right / circumference
+
+    @staticmethod
+    def _measure_wall(rangefinder, samples: int = 9) -> float:
+        """
+        Non-api method; the median of several rangefinder readings, ignoring timeouts
+        """
+        readings = []
+        for _ in range(samples):
+            reading = rangefinder.distance()
+            if reading != rangefinder.MAX_VALUE:
+                readings.append(reading)
+            time.sleep(0.06)
+        if len(readings) == 0:
+            raise Exception("The rangefinder can't see a wall")
+        readings.sort()
+        return readings[len(readings) // 2]
@@ -0,0 +1,239 @@
+from .controller import Controller
+from .timeout import Timeout
+import math
+
+class DriveMove:
+
+    def __init__(self, drivetrain, timeout: float = None):
+        """
+        A drivetrain move that runs one control step each time it is polled, so that it can be driven by a blocking loop,
+        an asyncio task, or a user's own loop alongside other work. The drivetrain is stopped when the move finishes or is cancelled.
+
+        :param drivetrain: The drivetrain to move
+        :type drivetrain: DifferentialDrive
+        :param timeout: The amount of time before the move gives up (In Seconds)
+        :type timeout: float
+        """
+        self.drivetrain = drivetrain
+        self._time_out = Timeout(timeout)
+        self._done = False
+        self.reached = False
+
+    def poll(self) -> bool:
+        """
+        Runs one control step. Call this about every 10 ms until it returns False
+
+        :return: if the move is still running
+        :rtype: bool
+        """
+        if self._done:
+            return False
+        if self._step() or self._time_out.is_done():
+            self._done = True
+            self.drivetrain.stop()
+            self.reached = not self._time_out.is_done()
+            return False
+        return True
+
+    def is_done(self) -> bool:
+        """
+        :return: if the move has finished, timed out or been cancelled
+        :rtype: bool
+        """
+        return self._done
+
+    def cancel(self):
+        """
+        Stops the move and the drivetrain, if the move is still running
+        """
+        if not self._done:
+            self._done = True
+            self.drivetrain.stop()
+
+    def _step(self) -> bool:
+        """
+        Non-api method; runs one control step
+
+        :return: if the move has reached its goal
+        :rtype: bool
+        """
+        return True
+
+
+class StraightMove(DriveMove):
+
+    def __init__(self, drivetrain, distance: float, main_controller: Controller, secondary_controller: Controller, timeout: float = None):
+        """
+        Drives forward the specified distance, holding the starting heading. See DifferentialDrive.straight
+
+        :param drivetrain: The drivetrain to move
+        :type drivetrain: DifferentialDrive
+        :param distance: The distance for the robot to travel (In Centimeters)
+        :type distance: float
+        :param main_controller: The main controller, for handling the distance driven forwards
+        :type main_controller: Controller
+        :param secondary_controller: The secondary controller, for correcting heading error that may result during the drive.
+        :type secondary_controller: Controller
+        :param timeout: The amount of time before the robot stops trying to move forward (In Seconds)
+        :type timeout: float
+        """
+        super().__init__(drivetrain, timeout)
+        self.distance = distance
+        self.main_controller = main_controller
+        self.secondary_controller = secondary_controller
+        self._starting_left, self._starting_right = drivetrain.get_encoder_positions()
+
+        if drivetrain.imu is not None:
+            # record current heading to maintain it
+            self._initial_heading = drivetrain.imu.get_yaw()
+        else:
+            self._initial_heading = 0
+
+    def _step(self) -> bool:
+        drivetrain = self.drivetrain
+
+        # calculate the distance traveled
+        left_position, right_position = drivetrain.get_encoder_positions()
+        left_delta = left_position - self._starting_left
+        right_delta = right_position - self._starting_right
+        dist_traveled = (left_delta + right_delta) / 2
+
+        # PID for distance
+        distance_error = self.distance - dist_traveled
+        effort = self.main_controller.update(distance_error)
+
+        if self.main_controller.is_done():
+            return True
+
+        # calculate heading correction
+        if drivetrain.imu is not None:
+            current_heading = drivetrain.imu.get_yaw()
+        else:
+            current_heading = ((right_delta-left_delta)/2)*360/(drivetrain.track_width*math.pi)
+
+        headingCorrection = self.secondary_controller.update(self._initial_heading - current_heading)
+
+        drivetrain.set_effort(effort - headingCorrection, effort + headingCorrection)
+        return False
+
+
+class TurnMove(DriveMove):
+
+    def __init__(self, drivetrain, turn_degrees: float, main_controller: Controller, secondary_controller: Controller, timeout: float = None, use_imu: bool = True):
+        """
+        Turns the robot some relative heading, holding its position. See DifferentialDrive.turn
+
+        :param drivetrain: The drivetrain to move
+        :type drivetrain: DifferentialDrive
+        :param turn_degrees: The number of angle for the robot to turn (In Degrees)
+        :type turn_degrees: float
+        :param main_controller: The main controller, for handling the angle turned
+        :type main_controller: Controller
+        :param secondary_controller: The secondary controller, for maintaining position during the turn by controlling the encoder count difference
+        :type secondary_controller: Controller
+        :param timeout: The amount of time before the robot stops trying to turn (In Seconds)
+        :type timeout: float
+        :param use_imu: A boolean flag that changes if the main controller bases its movement off of the imu (True) or the encoders (False)
+        :type use_imu: bool
+        """
+        super().__init__(drivetrain, timeout)
+        self.main_controller = main_controller
+        self.secondary_controller = secondary_controller
+        self._use_imu = use_imu and (drivetrain.imu is not None)
+        self._starting_left, self._starting_right = drivetrain.get_encoder_positions()
+
+        if self._use_imu:
+            turn_degrees += drivetrain.imu.get_yaw()
+        self.turn_degrees = turn_degrees
+
+    def _step(self) -> bool:
+        drivetrain = self.drivetrain
+
+        # calculate encoder correction to minimize drift
+        left_position, right_position = drivetrain.get_encoder_positions()
+        left_delta = left_position - self._starting_left
+        right_delta = right_position - self._starting_right
+        encoder_correction = self.secondary_controller.update(left_delta + right_delta)
+
+        if self._use_imu:
+            # calculate turn error (in degrees) from the imu
+            turn_error = self.turn_degrees - drivetrain.imu.get_yaw()
+        else:
+            # calculate turn error (in degrees) from the encoder counts
+            turn_error = self.turn_degrees - ((right_delta-left_delta)/2)*360/(drivetrain.track_width*math.pi)
+
+        # Pass the turn error to the main controller to get a turn speed
+        turn_speed = self.main_controller.update(turn_error)
+
+        if self.main_controller.is_done():
+            return True
+
+        drivetrain.set_effort(-turn_speed - encoder_correction, turn_speed - encoder_correction)
+        return False
+
+
+class ArcMove(DriveMove):
+
+    def __init__(self, drivetrain, radius: float, angle: float, main_controller: Controller, secondary_controller: Controller, timeout: float = None, use_imu: bool = True):
+        """
+        Drives along an arc, holding the heading to where it should be at each point along it. See DifferentialDrive.arc
+
+        :param drivetrain: The drivetrain to move
+        :type drivetrain: DifferentialDrive
+        :param radius: The radius of the arc, measured to the center of the robot (In Centimeters). Positive curves left, negative curves right.
+            Raises ValueError if 0, since that is a turn in place
+        :type radius: float
+        :param angle: How far around the circle to drive (In Degrees), negative to drive backwards
+        :type angle: float
+        :param main_controller: The main controller, for handling the distance driven along the arc
+        :type main_controller: Controller
+        :param secondary_controller: The secondary controller, for keeping the heading on the arc
+        :type secondary_controller: Controller
+        :param timeout: The amount of time before the robot stops trying to drive the arc (In Seconds)
+        :type timeout: float
+        :param use_imu: A boolean flag that changes if heading is measured with the imu (True) or the encoders (False)
+        :type use_imu: bool
+        """
+        if radius == 0:
+            raise ValueError("An arc needs a non-zero radius; use turn to turn in place")
+        super().__init__(drivetrain, timeout)
+        self.radius = radius
+        self.distance = abs(radius) * math.radians(angle)
+        self.main_controller = main_controller
+        self.secondary_controller = secondary_controller
+        self._use_imu = use_imu and (drivetrain.imu is not None)
+        self._starting_left, self._starting_right = drivetrain.get_encoder_positions()
+        self._initial_heading = drivetrain.imu.get_yaw() if self._use_imu else 0
+
+        # Share of the effort each wheel gets, with the outer wheel at 1
+        half_track = drivetrain.track_width / 2
+        left_ratio = 1 - half_track / radius
+        right_ratio = 1 + half_track / radius
+        outer = max(abs(left_ratio), abs(right_ratio))
+        self._left_ratio = left_ratio / outer
+        self._right_ratio = right_ratio / outer
+
+    def _step(self) -> bool:
+        drivetrain = self.drivetrain
+
+        left_position, right_position = drivetrain.get_encoder_positions()
+        left_delta = left_position - self._starting_left
+        right_delta = right_position - self._starting_right
+        dist_traveled = (left_delta + right_delta) / 2
+
+        effort = self.main_controller.update(self.distance - dist_traveled)
+
+        if self.main_controller.is_done():
+            return True
+
+        # Where the heading should be for the distance driven so far
+        target_heading = self._initial_heading + math.degrees(dist_traveled / self.radius)
+        if self._use_imu:
+            current_heading = drivetrain.imu.get_yaw()
+        else:
+            current_heading = ((right_delta-left_delta)/2)*360/(drivetrain.track_width*math.pi)
+
+        headingCorrection = self.secondary_controller.update(target_heading - current_heading)
+
+        drivetrain.set_effort(effort * self._left_ratio - headingCorrection, effort * self._right_ratio + headingCorrection)
+        return False
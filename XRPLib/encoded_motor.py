@@ -1,8 +1,11 @@
 from .motor import Motor
 from .encoder import Encoder
-from machine import Timer
+from .scheduler import Scheduler
 from .controller import Controller
 from .pid import PID
+from .velocity_estimator import VelocityEstimator
+from .motion_profile import MotionProfile
+import time
 
 class EncodedMotor:
 
@@ -11,11 +14,15 @@ class EncodedMotor:
     _DEFAULT_MOTOR_THREE_INSTANCE = None
     _DEFAULT_MOTOR_FOUR_INSTANCE = None
 
+    # Below this many counts per update, the encoder's edge period (if measured) gives a better speed than the count difference
+    _PERIOD_SPEED_THRESHOLD = 4
+
     @classmethod
     def get_default_encoded_motor(cls, index:int = 1):
         """
         Get one of the default XRP v2 motor instances. These are singletons, so only one instance of each of these will ever exist.
         Raises an exception if an invalid index is requested.
+        Edge period measurement is off for the default motors, since it needs the second PIO block; see start_period_measurement.
 
         :param index: The index of the motor to get; 1 for left, 2 for right, 3 for motor 3, 4 for motor 4
         :type index: int
@@ -52,24 +59,58 @@ class EncodedMotor:
             return Exception("Invalid motor index")
         return motor
     
-    def __init__(self, motor: Motor, encoder: Encoder):
+    def __init__(self, motor: Motor, encoder: Encoder, update_rate: float = 50):
+        """
+        A motor with an encoder, which can hold a target speed in the background.
+
+        :param motor: The motor to drive
+        :type motor: Motor
+        :param encoder: The encoder attached to that motor
+        :type encoder: Encoder
+        :param update_rate: How often speed control runs, in Hz (50 to 1000). Defaults to 50 Hz
+        :type update_rate: float
+        """
         
         self._motor = motor
         self._encoder = encoder
+        self._resolution = encoder.resolution
+        self._init_control(update_rate)
 
+    def _init_control(self, update_rate: float):
+        """
+        Non-api method; sets up the control state and starts the background updates
+        """
         self.target_speed = None
+        # Gains are for an error in counts per second
         self.DEFAULT_SPEED_CONTROLLER = PID(
-            kp=0.035,
-            ki=0.03,
+            kp=0.0007,
+            ki=0.0006,
             kd=0,
         )
         self.speedController = self.DEFAULT_SPEED_CONTROLLER
+
+        # Position control, in counts. None when not holding a position
+        self.target_position = None
+        self.positionController = None
+        # If True, the position controller outputs a target speed instead of an effort
+        self._position_cascade = False
+        # Motion profile being followed, if any. Positions are offset from where the profile started
+        self._profile = None
+        self._profile_origin = 0
+        self._profile_scale = 1
+        self._profile_start_time = 0
+
         self.prev_position = 0
+        self._prev_time = time.ticks_us()
+        # Speed in counts per second, measured over the actual time between updates.
+        # raw_speed is the unfiltered measurement, speed is after the velocity estimator (if any)
+        self.raw_speed = 0
         self.speed = 0
-        # Use a virtual timer so we can leave the hardware timers up for the user
-        self.updateTimer = Timer(-1)
-        # If the update timer is not running, start it at 50 Hz (20ms updates)
-        self.updateTimer.init(period=20, callback=lambda t:self._update())
+        self._velocity_estimator = None
+        # The edge period has no direction, so remember which way the motor last moved
+        self._direction = 1
+        # Run speed control on the shared scheduler, so all motors update back-to-back on the same tick
+        self._update_task = Scheduler.get_default_scheduler().add_task(self._update, self._rate_to_period(update_rate))
 
     def set_effort(self, effort: float):
         """
@@ -105,14 +146,34 @@ class EncodedMotor:
         Resets the encoder position back to zero.
         """
         self._encoder.reset_encoder_position()
+        # Keep the next speed measurement from seeing the jump in position
+        self.prev_position = 0
+        if self._velocity_estimator is not None:
+            self._velocity_estimator.reset()
+
+    def start_period_measurement(self, index: int) -> bool:
+        """
+        Measures the time between encoder edges on a second PIO state machine, for better speed readings at low rpm.
+        Needs a state machine from the second PIO block (4-7), which the Wi-Fi driver of a Pico W may already be using.
+        If the state machine can't be claimed, speed keeps coming from the change in position alone.
+
+        :param index: The index of the state machine to be used, indexed 4-7
+        :type index: int
+        :return: True if period measurement was started
+        :rtype: bool
+        """
+        return self._encoder.start_period_measurement(index)
 
-    def get_speed(self) -> float:
+    def get_speed(self, raw: bool = False) -> float:
         """
+        :param raw: If True, returns the unfiltered speed instead of the output of the velocity estimator
+        :type raw: bool
         :return: The speed of the motor, in rpm
         :rtype: float
         """
-        # Convert from counts per 20ms to rpm (60 sec/min, 50 Hz)
-        return self.speed*(60*50)/self._encoder.resolution
+        speed = self.raw_speed if raw else self.speed
+        # Convert from counts per second to rpm (60 sec/min)
+        return speed*60/self._resolution
 
     def set_speed(self, speed_rpm: float = None):
         """
@@ -122,14 +183,23 @@ class EncodedMotor:
         :param target_speed_rpm: The target speed for the motor in rpm, or None
         :type target_speed_rpm: float, or None
         """
+        # Speed control replaces any position being held
+        self.target_position = None
+        self._profile = None
         if speed_rpm is None or speed_rpm == 0:
             self.target_speed = None
             self.set_effort(0)
             return
-        # Convert from rev per min to counts per 20ms (60 sec/min, 50 Hz)
-        self.target_speed = speed_rpm*self._encoder.resolution/(60*50)
+        # Convert from rev per min to counts per second (60 sec/min)
+        was_running = self.target_speed is not None
+        self.target_speed = speed_rpm*self._resolution/60
+        self.speedController.set_target(self.target_speed)
+        if was_running:
+            # Path followers change the target every tick, so keep the controller's integral and the speed measurement going
+            return
         self.speedController.clear_history()
         self.prev_position = self.get_position_counts()
+        self._prev_time = time.ticks_us()
 
     def set_speed_controller(self, new_controller: Controller):
         """
@@ -140,15 +210,191 @@ class EncodedMotor:
         """
         self.speedController = new_controller
         self.speedController.clear_history()
+        if self.target_speed is not None:
+            self.speedController.set_target(self.target_speed)
+
+    def set_position(self, target_position: float, max_effort: float = 0.5, max_speed: float = None, controller: Controller = None):
+        """
+        Moves to a position and holds it in the background. Returns immediately; use is_done() to check if it has arrived.
+        Call set_speed() with no parameters to stop holding the position.
+
+        :param target_position: The position to move to, in revolutions, relative to the last time reset was called
+        :type target_position: float
+        :param max_effort: The max effort to move with (Bounded from 0 to 1). Ignored if max_speed is given
+        :type max_effort: float
+        :param max_speed: If given, the position controller sets a target speed (in rpm, up to this value) for speed control to follow,
+            instead of setting the effort directly
+        :type max_speed: float, or None
+        :param controller: The controller for the position error (in revolutions). Its output is an effort, or a speed in rpm if max_speed is given
+        :type controller: Controller
+        """
+        if controller is None:
+            if max_speed is None:
+                controller = PID(
+                    kp = 2.0,
+                    ki = 0.5,
+                    kd = 0.05,
+                    max_output = max_effort,
+                    max_integral = 0.5,
+                    tolerance = 0.01,
+                    tolerance_count = 3,
+                )
+            else:
+                controller = PID(
+                    kp = 300,
+                    max_output = max_speed,
+                    tolerance = 0.01,
+                    tolerance_count = 3,
+                )
+        controller.clear_history()
+        controller.set_target(0)
+        self._profile = None
+        self.positionController = controller
+        self._position_cascade = max_speed is not None
+        if self._position_cascade:
+            self.speedController.clear_history()
+        else:
+            self.target_speed = None
+        self.target_position = target_position * self._resolution
+
+    def follow_profile(self, profile: MotionProfile, scale: float = 1.0, max_correction: float = 60, controller: Controller = None):
+        """
+        Follows a motion profile in the background, starting from the current position. Returns immediately; use is_done() to check if it has finished.
+        Each update, the profile's velocity is used directly as the target speed, and a position controller adds a correction for any position error.
+        At the end of the profile, the final position is held until set_speed() is called.
+
+        :param profile: The profile to follow
+        :type profile: MotionProfile
+        :param scale: Revolutions per unit of distance in the profile, for profiles made in other units (e.g. cm)
+        :type scale: float
+        :param max_correction: The largest speed correction (in rpm) the position controller can add
+        :type max_correction: float
+        :param controller: The controller for the position error (in revolutions). Its output is a speed correction in rpm
+        :type controller: Controller
+        """
+        if controller is None:
+            controller = PID(
+                kp = 300,
+                max_output = max_correction,
+                tolerance = 0.01,
+                tolerance_count = 3,
+            )
+        controller.clear_history()
+        controller.set_target(0)
+        self.positionController = controller
+        self._position_cascade = True
+        self.speedController.clear_history()
+        self._profile_origin = self.get_position_counts()
+        self._profile_scale = scale * self._resolution
+        self._profile_start_time = time.ticks_us()
+        self.target_position = self._profile_origin
+        self._profile = profile
+
+    def is_done(self) -> bool:
+        """
+        :return: True if the position set by set_position (or the end of the profile set by follow_profile) has been reached, or if no position is being held
+        :rtype: bool
+        """
+        if self.target_position is None:
+            return True
+        if self._profile is not None and time.ticks_diff(time.ticks_us(), self._profile_start_time) < self._profile.get_duration() * 1000000:
+            return False
+        return self.positionController.is_done()
+
+    def set_velocity_estimator(self, estimator: VelocityEstimator = None):
+        """
+        Sets a filter for the measured speed. The filtered speed is what get_speed() returns and what speed control uses.
+        Call with no parameters to go back to the raw speed.
+
+        :param estimator: The new VelocityEstimator, or None
+        :type estimator: VelocityEstimator, or None
+        """
+        if estimator is not None:
+            estimator.reset()
+        self._velocity_estimator = estimator
+
+    def set_update_rate(self, update_rate: float):
+        """
+        Sets how often speed control runs. Speed is measured over the actual time between updates,
+        so this doesn't change the units of anything, but the speed controller may need retuning.
+
+        :param update_rate: The update rate, in Hz (50 to 1000)
+        :type update_rate: float
+        """
+        Scheduler.get_default_scheduler().set_task_period(self._update_task, self._rate_to_period(update_rate))
+
+    def get_update_rate(self) -> float:
+        """
+        :return: How often speed control runs, in Hz
+        :rtype: float
+        """
+        return 1000 / self._update_task.period_ms
+
+    def _rate_to_period(self, update_rate: float) -> int:
+        """
+        Non-api method; converts an update rate in Hz to a whole number of milliseconds for the scheduler
+        """
+        update_rate = max(50, min(1000, update_rate))
+        return round(1000 / update_rate)
 
     def _update(self):
         """
         Non-api method; used for updating motor efforts for speed control
         """
+        current_time = time.ticks_us()
         current_position = self.get_position_counts()
-        self.speed = current_position - self.prev_position
+        # Time since the last update in seconds, measured rather than assumed
+        dt = time.ticks_diff(current_time, self._prev_time) / 1000000
+        if dt <= 0:
+            return
+        self._prev_time = current_time
+        delta = current_position - self.prev_position
+        if self._encoder.measures_period() and abs(delta) < self._PERIOD_SPEED_THRESHOLD:
+            # Too few counts this update to be accurate, so use the time between edges instead
+            if delta != 0:
+                self._direction = 1 if delta > 0 else -1
+            self.raw_speed = self._direction * self._encoder.get_period_speed()
+        else:
+            self.raw_speed = delta / dt
+        if self._velocity_estimator is not None:
+            self.speed = self._velocity_estimator.update(current_position, self.raw_speed, dt)
+        else:
+            self.speed = self.raw_speed
+        effort = self._control(current_time, current_position, dt)
+        if effort is not None:
+            self._motor.set_effort(effort)
+        self.prev_position = current_position
+
+    def _control(self, current_time: int, current_position: float, dt: float):
+        """
+        Non-api method; runs position and speed control for one update
+
+        :return: The effort to set, or None if nothing is being controlled
+        """
+        effort = None
+        if self.target_position is not None:
+            profile_speed = 0
+            if self._profile is not None:
+                # Look up where the profile should be now, in counts and counts per second
+                index = self._profile.index_at(time.ticks_diff(current_time, self._profile_start_time) / 1000000)
+                self.target_position = self._profile_origin + self._profile.positions[index] * self._profile_scale
+                profile_speed = self._profile.velocities[index] * self._profile_scale
+            # Position error in revolutions
+            error = (self.target_position - current_position) / self._resolution
+            if self.positionController.accepts_dt:
+                output = self.positionController.update(error, dt=dt)
+            else:
+                output = self.positionController.update(error)
+            if self._position_cascade:
+                # Output is a speed in rpm, for speed control below to follow
+                self.target_speed = profile_speed + output*self._resolution/60
+                self.speedController.set_target(self.target_speed)
+            else:
+                effort = output
         if self.target_speed is not None:
             error = self.target_speed - self.speed
-            effort = self.speedController.update(error)
-            self._motor.set_effort(effort)
-        self.prev_position = current_position
\ No newline at end of file
+            if self.speedController.accepts_dt:
+                effort = self.speedController.update(error, dt=dt)
+            else:
+                effort = self.speedController.update(error)
+        return effort
\ No newline at end of file
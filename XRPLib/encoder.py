@@ -3,13 +3,22 @@
 import machine
 import rp2
 import time
+from array import array
 
 class Encoder:
     _gear_ratio = (30/14) * (28/16) * (36/9) * (26/8) # 48.75
     _counts_per_motor_shaft_revolution = 12
     resolution = _counts_per_motor_shaft_revolution * _gear_ratio # 585
-    
-    def __init__(self, index, encAPin, encBPin):
+    _RX_FIFO_DEPTH = 4
+    # The period program counts once every 2 cycles, so this gives 2us per count
+    _PERIOD_SM_FREQ = 1_000_000
+    _US_PER_PERIOD_COUNT = 2
+    # Each rising edge on channel A is one full quadrature cycle, which is 4 counts
+    _COUNTS_PER_EDGE = 4
+    # If no edge has been seen for this long, the motor is treated as stopped
+    _PERIOD_TIMEOUT_US = 500000
+
+    def __init__(self, index, encAPin, encBPin, period_index:int = None):
         """
         Uses the on board PIO State Machine to keep track of encoder positions. 
         Only 4 encoders can be instantiated this way.
@@ -20,13 +29,69 @@ class Encoder:
         :type encAPin: int
         :param encBPin: The pin the right reflectance sensor is connected to
         :type encBPin: int
+        :param period_index: If given, the index of a second state machine used to measure edge periods, indexed 4-7. See start_period_measurement
+        :type period_index: int
         """
         if(abs(encAPin - encBPin) != 1):
             raise Exception("Encoder pins must be successive!")
+        self._encAPin = encAPin
         basePin = machine.Pin(min(encAPin, encBPin))
         self.sm = rp2.StateMachine(index, self._encoder, in_base=basePin)
+        # The state machine pushes the count on every loop without blocking, so the RX FIFO
+        # is always full of stale words. A read takes all of them plus one fresh push in a
+        # single get() call, into a preallocated signed buffer
+        self._rx_buffer = array('i', [0] * (self._RX_FIFO_DEPTH + 1))
         self.reset_encoder_position()
         self.sm.active(1)
+
+        self._period_sm = None
+        if period_index is not None:
+            self.start_period_measurement(period_index)
+
+    def start_period_measurement(self, index: int) -> bool:
+        """
+        Starts a second state machine that measures the time between rising edges on channel A.
+        This gives a usable speed at low RPM, where only a few counts arrive between control updates.
+        The counting program fills the instruction memory of the first PIO block,
+        so this needs a state machine from the second block, indexed 4-7.
+        On a Pico W the Wi-Fi driver also uses that block, so this may fail there.
+        If the state machine can't be claimed, speed keeps coming from the count difference alone.
+
+        :param index: The index of the state machine to be used, indexed 4-7.
+        :type index: int
+        :return: True if period measurement was started
+        :rtype: bool
+        """
+        self._period_buffer = array('i', [0] * self._RX_FIFO_DEPTH)
+        period_view = memoryview(self._period_buffer)
+        self._period_views = tuple(period_view[:level] for level in range(self._RX_FIFO_DEPTH + 1))
+        self._last_period_us = 0
+        self._last_edge_time = time.ticks_us()
+        try:
+            period_sm = rp2.StateMachine(index, self._edge_period, freq=self._PERIOD_SM_FREQ,
+                                         jmp_pin=machine.Pin(self._encAPin, machine.Pin.IN))
+            # The program raises an interrupt on each rising edge, so the time of the edge is known
+            # even if its period isn't read until later. Hard, so that it runs right away
+            period_sm.irq(self._on_edge, hard=True)
+        except (OSError, ValueError):
+            self._period_sm = None
+            return False
+        self._period_sm = period_sm
+        self._period_sm.active(1)
+        return True
+
+    def _on_edge(self, sm):
+        """
+        Non-api method; records the time of a rising edge on channel A. Runs in a hard interrupt, so it must not allocate
+        """
+        self._last_edge_time = time.ticks_us()
+
+    def measures_period(self) -> bool:
+        """
+        :return: True if edge period measurement has been started for this encoder
+        :rtype: bool
+        """
+        return self._period_sm is not None
     
     def reset_encoder_position(self):
         """
@@ -43,15 +108,10 @@ class Encoder:
         :return: The position of the encoded motor, in counts, relative to the last time reset was called.
         :rtype: int
         """
-        # Read 5 times for it to get past the buffer
-        counts = self.sm.get()
-        counts = self.sm.get()
-        counts = self.sm.get()
-        counts = self.sm.get()
-        counts = self.sm.get()
-        if(counts > 2**31):
-            counts -= 2**32
-        return counts
+        # The FIFO is always full, so read past its 4 stale words to the next push, in one call.
+        # The buffer is signed, so counts below zero come back negative without a big int
+        self.sm.get(self._rx_buffer)
+        return self._rx_buffer[self._RX_FIFO_DEPTH]
     
     def get_position(self):
         """
@@ -60,6 +120,33 @@ class Encoder:
         """
         return self.get_position_counts() / self.resolution
 
+    def get_period_speed(self) -> float:
+        """
+        Speed computed from the time between the last two rising edges on channel A. 
+        This has no direction, so the sign has to come from the change in position.
+        Returns 0 if period measurement hasn't been started.
+
+        :return: The speed of the encoded motor, in counts per second. Always positive.
+        :rtype: float
+        """
+        if self._period_sm is None:
+            return 0
+        level = self._period_sm.rx_fifo()
+        now = time.ticks_us()
+        if level > 0:
+            # A new edge has arrived since the last read, only the newest period matters.
+            # The time of that edge was already recorded by its interrupt
+            self._period_sm.get(self._period_views[level])
+            self._last_period_us = self._period_buffer[level - 1] * self._US_PER_PERIOD_COUNT
+        if self._last_period_us == 0:
+            return 0
+        # If it has been longer than the last period since an edge, the motor has slowed down
+        # by at least that much, so use the time since that edge instead
+        period_us = max(self._last_period_us, time.ticks_diff(now, self._last_edge_time))
+        if period_us > self._PERIOD_TIMEOUT_US:
+            return 0
+        return self._COUNTS_PER_EDGE * 1_000_000 / period_us
+
     @rp2.asm_pio(in_shiftdir=rp2.PIO.SHIFT_LEFT, out_shiftdir=rp2.PIO.SHIFT_RIGHT)
     def _encoder():
         # Register descriptions:
@@ -115,4 +202,30 @@ class Encoder:
         jmp("read")
         jmp("read")
         jmp("read")
-        jmp("read")
\ No newline at end of file
+        jmp("read")
+
+    @rp2.asm_pio()
+    def _edge_period():
+        # Register descriptions:
+        # Y - Number of loops since the last rising edge, counting down from 0xFFFFFFFF
+        # ISR - Push the number of loops when a rising edge is found
+        #
+        # Both waiting loops take 2 cycles per count, so a count is 2 cycles long
+
+        label("start")
+        mov(y, invert(null))    # Reset the loop count
+
+        label("wait_low")       # Wait for channel A to go low
+        jmp(y_dec, "check_low") # Count, and continue either way
+        label("check_low")
+        jmp(pin, "wait_low")    # Still high, keep waiting
+
+        label("wait_high")      # Wait for channel A to go high again
+        jmp(pin, "edge")        # Rising edge found
+        jmp(y_dec, "wait_high") # Count, and keep waiting
+
+        label("edge")
+        mov(isr, invert(y))     # Inverting the count down gives the number of loops
+        push(noblock)           # Push the period to the RX buffer
+        irq(rel(0))             # Interrupt, so the time of the edge is recorded
+        jmp("start")
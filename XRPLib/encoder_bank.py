@@ -0,0 +1,66 @@
+from .encoder import Encoder
+from array import array
+import time
+
+class EncoderBank:
+
+    _MAX_ENCODERS = 4
+
+    def __init__(self, *encoders: Encoder):
+        """
+        Reads a group of encoders back-to-back in one pass, so that all of their counts are sampled at
+        (nearly) the same instant and share a single timestamp.
+        Only 4 encoders can exist at once (one per PIO state machine), so a bank holds at most 4.
+
+        :param encoders: The encoders to add to this bank, in the order their counts should be stored
+        :type encoders: tuple<Encoder>
+        """
+        self._encoders = []
+        self._readers = ()
+        # Preallocated so that update() doesn't allocate
+        self.counts = array('i', [0] * self._MAX_ENCODERS)
+        self.timestamp_us = 0
+        for encoder in encoders:
+            self.add_encoder(encoder)
+
+    def add_encoder(self, encoder: Encoder) -> int:
+        """
+        Adds an encoder to this bank. Raises an exception if the bank is already full.
+
+        :param encoder: The encoder to add
+        :type encoder: Encoder
+        :return: The index of this encoder's count in the bank
+        :rtype: int
+        """
+        if len(self._encoders) >= self._MAX_ENCODERS:
+            raise Exception("An EncoderBank can only hold 4 encoders!")
+        self._encoders.append(encoder)
+        # Cache the bound read methods so each pass is just a tight loop of calls
+        self._readers = tuple(e.get_position_counts for e in self._encoders)
+        return len(self._encoders) - 1
+
+    def update(self):
+        """
+        Reads every encoder in this bank, back-to-back, and records the time of the read
+        """
+        readers = self._readers
+        counts = self.counts
+        self.timestamp_us = time.ticks_us()
+        for i in range(len(readers)):
+            counts[i] = readers[i]()
+
+    def get_counts(self, index: int) -> int:
+        """
+        :param index: The index of the encoder, in the order it was added to this bank
+        :type index: int
+        :return: The count of that encoder from the last update, in counts
+        :rtype: int
+        """
+        return self.counts[index]
+
+    def get_timestamp(self) -> int:
+        """
+        :return: The time of the last update, from time.ticks_us()
+        :rtype: int
+        """
+        return self.timestamp_us
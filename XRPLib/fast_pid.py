@@ -0,0 +1,246 @@
+import micropython
+from micropython import const
+from array import array
+from .controller import Controller
+import time
+import math
+
+"""
+PID controller for use inside timer callbacks
+"""
+
+# Layout of one PID channel in a float state array. ControllerBank packs many channels with the same layout
+KP = const(0)
+KI = const(1)
+KD = const(2)
+MIN_OUTPUT = const(3)
+MAX_OUTPUT = const(4)
+MAX_INTEGRAL = const(5)
+TOLERANCE = const(6)
+INTEGRAL = const(7)
+PREV_ERROR = const(8)
+STRIDE = const(9)
+
+# Indices into the fixed-point state array
+_F_KP = const(0)
+_F_KI = const(1)
+_F_KD = const(2)
+_F_MAX_OUTPUT = const(3)
+_F_MAX_INTEGRAL = const(4)
+_F_TOLERANCE = const(5)
+_F_INTEGRAL = const(6)
+_F_PREV_ERROR = const(7)
+_F_OUTPUT = const(8)
+
+# Largest small int; anything bigger is allocated on the heap when it is read back out of the array
+_F_MAX_SMALL_INT = const(0x3FFFFFFF)
+
+@micropython.native
+def update_channels(state, first, times, errors, outputs, dt: float, start: int, stop: int):
+    """
+    Updates the PID channels from start up to (not including) stop in one pass over packed arrays.
+    Shared by FastPID (one channel) and ControllerBank (many channels)
+
+    :param state: The gains, limits and history of each channel, STRIDE values per channel
+    :type state: array<float>
+    :param first: 1 for each channel that has not had an update yet, since it has no previous error for the derivative
+    :type first: bytearray
+    :param times: How many consecutive updates each channel's error has been within tolerance
+    :type times: array<int>
+    :param errors: The error of each channel
+    :type errors: array<float>
+    :param outputs: Where to write the output of each channel
+    :type outputs: array<float>
+    :param dt: The time since the last update, in seconds
+    :type dt: float
+    """
+    if dt <= 0:
+        dt = 0.01
+    for channel in range(start, stop):
+        base = channel * STRIDE
+        error = errors[channel]
+
+        tolerance = state[base + TOLERANCE]
+        if error < tolerance and error > -tolerance:
+            times[channel] += 1
+        else:
+            times[channel] = 0
+
+        max_integral = state[base + MAX_INTEGRAL]
+        integral = state[base + INTEGRAL] + error * dt
+        if integral > max_integral:
+            integral = max_integral
+        elif integral < -max_integral:
+            integral = -max_integral
+        state[base + INTEGRAL] = integral
+
+        if first[channel]:
+            derivative = 0
+            first[channel] = 0
+        else:
+            derivative = (error - state[base + PREV_ERROR]) / dt
+        state[base + PREV_ERROR] = error
+
+        output = state[base + KP] * error + state[base + KI] * integral + state[base + KD] * derivative
+
+        # Bound output by minimum, then maximum
+        min_output = state[base + MIN_OUTPUT]
+        max_output = state[base + MAX_OUTPUT]
+        if output > 0:
+            if output < min_output:
+                output = min_output
+            if output > max_output:
+                output = max_output
+        else:
+            if output > -min_output:
+                output = -min_output
+            if output < -max_output:
+                output = -max_output
+        outputs[channel] = output
+
+class FastPID(Controller):
+
+    # Fixed-point outputs are scaled so that this value is an output of 1.0
+    ONE = 65536
+
+    accepts_dt = True
+
+    def __init__(self,
+                 kp = 1.0,
+                 ki = 0.0,
+                 kd = 0.0,
+                 min_output = 0.0,
+                 max_output = 1.0,
+                 max_integral = None,
+                 tolerance = 0.1,
+                 tolerance_count = 1
+                 ):
+        """
+        A PID controller whose state lives in preallocated arrays, for use in timer callbacks where garbage collection pauses cause jitter.
+        Takes dt as an argument instead of reading the clock, and has an integer-only update_fixed path that doesn't allocate at all.
+        The float update path avoids attribute lookups, but still allocates boxed floats.
+        Has no max_derivative or debug output; use PID for those. Telemetry is recorded by update, but not update_fixed.
+        For update_fixed, the tolerance applies to integer errors, so it is rounded up to a whole number (0.1 means only an error of 0).
+
+        :param kp: proportional gain
+        :param ki: integral gain
+        :param kd: derivative gain
+        :param min_output: minimum output
+        :param max_output: maximum output
+        :param max_integral: maximum integral windup allowed (will cap integral at this value)
+        :param tolerance: tolerance for exit condition
+        :param tolerance_count: number of times the error needs to be within tolerance for is_done to return True
+        """
+        if max_integral is None:
+            max_integral = 1e30
+        self._state = array('f', [kp, ki, kd, min_output, max_output, max_integral, tolerance, 0, 0])
+        # Gains in 1/65536ths, integral in error-milliseconds, output in 1/65536ths.
+        # The integral is also capped so that ki times the integral stays a small int
+        ki_fixed = round(ki * self.ONE)
+        max_integral_fixed = min(max_integral * 1000, _F_MAX_SMALL_INT // max(1, abs(ki_fixed)))
+        self._fixed = array('i', [
+            round(kp * self.ONE), ki_fixed, round(kd * self.ONE),
+            round(max_output * self.ONE), round(max_integral_fixed), math.ceil(tolerance), 0, 0, 0
+        ])
+        self.tolerance_count = tolerance_count
+        # One-channel arrays for update_channels
+        self._first = bytearray([1])
+        self._times = array('i', [0])
+        self._error = array('f', [0])
+        self._output = array('f', [0])
+        self._prev_time = 0
+
+    @micropython.native
+    def update(self, error: float, dt: float = None) -> float:
+        """
+        Handle a new update of this PID loop given an error.
+        The state is preallocated, but MicroPython boxes every float on the heap, so each call still allocates a few small objects.
+        Use update_fixed where that matters.
+
+        :param error: The error of the system being controlled by this PID controller
+        :type error: float
+        :param dt: The time since the last update in seconds. If None, it is measured from the clock
+        :type dt: float
+
+        :return: The system output from the controller, to be used as an effort value or for any other purpose
+        :rtype: float
+        """
+        if dt is None:
+            now = time.ticks_us()
+            dt = time.ticks_diff(now, self._prev_time) / 1000000 if not self._first[0] else 0.01
+            self._prev_time = now
+        if self.telemetry is not None:
+            # update_channels only keeps the output, so work out the terms from the state it starts from
+            s = self._state
+            step = dt if dt > 0 else 0.01
+            d = 0 if self._first[0] else s[KD] * (error - s[PREV_ERROR]) / step
+        self._error[0] = error
+        update_channels(self._state, self._first, self._times, self._error, self._output, dt, 0, 1)
+        output = self._output[0]
+        if self.telemetry is not None:
+            self.telemetry.record(error, s[KP] * error, s[KI] * s[INTEGRAL], d, output)
+        return output
+
+    @micropython.native
+    def update_fixed(self, error: int, dt_us: int) -> int:
+        """
+        Integer-only update, which never allocates as long as the intermediate products stay within small-int range (about +/-2**30).
+        Keep errors in the hundreds to low thousands (e.g. encoder counts, or milli-units) to stay in range.
+        min_output is not applied. The integral is capped at max_integral, or lower for large ki so that its term can't leave small-int range.
+
+        :param error: The error, as an integer in whatever unit suits the system
+        :type error: int
+        :param dt_us: The time since the last update, in microseconds
+        :type dt_us: int
+
+        :return: The output, where FastPID.ONE (65536) is an output of 1.0
+        :rtype: int
+        """
+        f = self._fixed
+        if dt_us <= 0:
+            dt_us = 10000
+
+        if error < f[_F_TOLERANCE] and error > -f[_F_TOLERANCE]:
+            self._times[0] += 1
+        else:
+            self._times[0] = 0
+
+        # Integral in error-milliseconds
+        integral = f[_F_INTEGRAL] + error * dt_us // 1000
+        if integral > f[_F_MAX_INTEGRAL]:
+            integral = f[_F_MAX_INTEGRAL]
+        elif integral < -f[_F_MAX_INTEGRAL]:
+            integral = -f[_F_MAX_INTEGRAL]
+        f[_F_INTEGRAL] = integral
+
+        if self._first[0]:
+            derivative_term = 0
+            self._first[0] = 0
+        else:
+            derivative_term = f[_F_KD] * (error - f[_F_PREV_ERROR]) * 1000 // dt_us * 1000
+        f[_F_PREV_ERROR] = error
+
+        output = f[_F_KP] * error + f[_F_KI] * integral // 1000 + derivative_term
+        if output > f[_F_MAX_OUTPUT]:
+            output = f[_F_MAX_OUTPUT]
+        elif output < -f[_F_MAX_OUTPUT]:
+            output = -f[_F_MAX_OUTPUT]
+        f[_F_OUTPUT] = output
+        return output
+
+    def is_done(self) -> bool:
+        """
+        :return: if error is within tolerance for tolerance_count consecutive times
+        :rtype: bool
+        """
+        return self._times[0] >= self.tolerance_count
+
+    def clear_history(self):
+        self._state[INTEGRAL] = 0
+        self._state[PREV_ERROR] = 0
+        self._output[0] = 0
+        self._fixed[_F_INTEGRAL] = 0
+        self._fixed[_F_PREV_ERROR] = 0
+        self._fixed[_F_OUTPUT] = 0
+        self._first[0] = 1
+        self._times[0] = 0
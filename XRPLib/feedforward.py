@@ -0,0 +1,201 @@
+from .controller import Controller
+from array import array
+import time
+
+"""
+Feedforward motor model with optional feedback correction
+"""
+
+class Feedforward(Controller):
+
+    accepts_dt = True
+
+    def __init__(self,
+                 kS = 0.0,
+                 kV = 0.0,
+                 kA = 0.0,
+                 feedback: Controller = None,
+                 max_output = 1.0
+                 ):
+        """
+        Predicts the effort needed for a target velocity from a simple motor model,
+        effort = kS * sign(velocity) + kV * velocity + kA * acceleration,
+        and adds the output of a feedback controller to correct whatever the model gets wrong.
+        Velocity is in the same units as the target given to set_target (counts per second when used for EncodedMotor speed control).
+
+        :param kS: static gain, the effort needed to overcome friction and start moving
+        :param kV: velocity gain, effort per unit of velocity
+        :param kA: acceleration gain, effort per unit of acceleration
+        :param feedback: controller for the remaining error, or None for pure feedforward
+        :param max_output: maximum output
+        """
+        self.kS = kS
+        self.kV = kV
+        self.kA = kA
+        self.feedback = feedback
+        self.max_output = max_output
+
+        self.target_velocity = 0
+        self.target_acceleration = 0
+
+    def calculate(self, velocity: float, acceleration: float = 0.0) -> float:
+        """
+        :param velocity: The velocity to predict the effort for
+        :type velocity: float
+        :param acceleration: The acceleration to predict the effort for
+        :type acceleration: float
+        :return: The effort predicted by the model, without any feedback
+        :rtype: float
+        """
+        if velocity > 0:
+            static = self.kS
+        elif velocity < 0:
+            static = -self.kS
+        else:
+            static = 0
+        return static + self.kV * velocity + self.kA * acceleration
+
+    def set_target(self, target: float, acceleration: float = 0.0):
+        """
+        :param target: The velocity to predict the effort for
+        :type target: float
+        :param acceleration: The acceleration the target is changing at, if known
+        :type acceleration: float
+        """
+        self.target_velocity = target
+        self.target_acceleration = acceleration
+
+    def update(self, error: float, dt: float = None) -> float:
+        """
+        Handle a new update given the velocity error
+
+        :param error: The velocity error, used only by the feedback controller
+        :type error: float
+
+        :return: The feedforward effort plus the feedback correction
+        :rtype: float
+        """
+        output = self.calculate(self.target_velocity, self.target_acceleration)
+        if self.feedback is not None:
+            if self.feedback.accepts_dt:
+                output += self.feedback.update(error, dt=dt)
+            else:
+                output += self.feedback.update(error)
+        return max(-self.max_output, min(self.max_output, output))
+
+    def is_done(self) -> bool:
+        """
+        :return: If the feedback controller has settled. Always True without feedback
+        :rtype: bool
+        """
+        if self.feedback is None:
+            return True
+        return self.feedback.is_done()
+
+    def clear_history(self):
+        if self.feedback is not None:
+            self.feedback.clear_history()
+
+    @classmethod
+    def characterize(cls, motor, max_effort: float = 0.6, ramp_rate: float = 0.1, step_effort: float = 0.4,
+                     step_time: float = 1.0, feedback: Controller = None):
+        """
+        Measures kS, kV and kA for an EncodedMotor by driving it, so make sure it is free to spin (or the robot has room to drive).
+        First the effort is ramped up slowly to find kS and kV from effort vs. steady velocity,
+        then a step in effort is applied to find kA from how fast the motor accelerates.
+        Velocities are in counts per second, matching EncodedMotor speed control.
+
+        :param motor: The motor to characterize
+        :type motor: EncodedMotor
+        :param max_effort: The effort to stop the ramp at
+        :type max_effort: float
+        :param ramp_rate: How fast to ramp the effort, in effort per second
+        :type ramp_rate: float
+        :param step_effort: The effort to use for the acceleration step
+        :type step_effort: float
+        :param step_time: How long to hold the step, in seconds
+        :type step_time: float
+        :param feedback: The feedback controller for the result, defaults to the motor's default speed controller
+        :type feedback: Controller
+        :return: The fitted Feedforward controller, ready for EncodedMotor.set_speed_controller
+        :rtype: Feedforward
+        """
+        sample_period = 0.02
+        motor.set_speed()
+
+        # Quasistatic ramp: at a slow ramp, acceleration is negligible, so effort = kS + kV * velocity
+        ramp_samples = int(max_effort / ramp_rate / sample_period) + 1
+        efforts = array('f', [0] * ramp_samples)
+        velocities = array('f', [0] * ramp_samples)
+        count = 0
+        start = time.ticks_ms()
+        for i in range(ramp_samples):
+            effort = min(max_effort, time.ticks_diff(time.ticks_ms(), start) / 1000 * ramp_rate)
+            motor.set_effort(effort)
+            time.sleep(sample_period)
+            velocity = motor.raw_speed
+            # Samples where the motor hasn't started moving say nothing about kV
+            if velocity > 0:
+                efforts[count] = effort
+                velocities[count] = velocity
+                count += 1
+        motor.set_effort(0)
+
+        kS, kV = cls._fit_line(velocities, efforts, count)
+
+        # Let the motor stop before the step
+        time.sleep(1)
+
+        # Step: effort - kS - kV * velocity is what's left to accelerate the motor
+        step_samples = int(step_time / sample_period) + 1
+        sum_aa = 0
+        sum_ar = 0
+        motor.set_effort(step_effort)
+        prev_velocity = motor.raw_speed
+        prev_time = time.ticks_us()
+        for i in range(step_samples):
+            time.sleep(sample_period)
+            velocity = motor.raw_speed
+            now = time.ticks_us()
+            dt = time.ticks_diff(now, prev_time) / 1000000
+            acceleration = (velocity - prev_velocity) / dt
+            prev_velocity = velocity
+            prev_time = now
+            # Once the motor is near its final speed, acceleration is mostly noise
+            if acceleration > 0:
+                residual = step_effort - kS - kV * velocity
+                sum_aa += acceleration * acceleration
+                sum_ar += acceleration * residual
+        motor.set_effort(0)
+
+        kA = sum_ar / sum_aa if sum_aa > 0 else 0
+
+        if feedback is None:
+            feedback = motor.DEFAULT_SPEED_CONTROLLER
+        return cls(kS=kS, kV=kV, kA=max(0, kA), feedback=feedback)
+
+    @staticmethod
+    def _fit_line(x, y, count: int) -> tuple:
+        """
+        Least squares fit of y = intercept + slope * x over the first count samples
+
+        :return: The intercept and slope
+        :rtype: tuple<float>
+        """
+        if count < 2:
+            return 0, 0
+        sum_x = 0
+        sum_y = 0
+        sum_xx = 0
+        sum_xy = 0
+        for i in range(count):
+            sum_x += x[i]
+            sum_y += y[i]
+            sum_xx += x[i] * x[i]
+            sum_xy += x[i] * y[i]
+        denominator = count * sum_xx - sum_x * sum_x
+        if denominator == 0:
+            return 0, 0
+        slope = (count * sum_xy - sum_x * sum_y) / denominator
+        intercept = (sum_y - slope * sum_x) / count
+        return intercept, slope
@@ -0,0 +1,144 @@
+from .pid import PID
+from array import array
+import time
+
+class GainScheduledController(PID):
+
+    def __init__(self, gain_table: list, operating_points: list, battery_points: list = None, board = None, battery_period: float = 0.1, **kwargs):
+        """
+        A PID controller whose kp, ki and kd are interpolated from a table, based on the operating point (the commanded effort or speed)
+        and optionally the battery reading, so one controller behaves the same for fast and slow moves and as the battery drains.
+
+        Without battery_points, gain_table has one (kp, ki, kd) entry per operating point.
+        With battery_points, gain_table has one row per battery point, and each row has one (kp, ki, kd) entry per operating point.
+        Values between points are interpolated linearly, and values outside the table use the nearest edge.
+
+        :param gain_table: The (kp, ki, kd) gains at each point
+        :type gain_table: list
+        :param operating_points: The operating points of the table, in increasing order. Compared against the absolute value of the operating point
+        :type operating_points: list<float>
+        :param battery_points: The battery readings of the table, in increasing order, as raw Board.on_switch readings (0 to 65535). If None, the battery is ignored
+        :type battery_points: list<int>
+        :param board: The board to read the battery from. Defaults to the default board if battery_points are given
+        :type board: Board
+        :param battery_period: How often to read the battery, in seconds
+        :type battery_period: float
+        :param kwargs: Any other PID parameters, such as max_output or tolerance
+        """
+        super().__init__(**kwargs)
+        self._operating_points = array('f', operating_points)
+        if battery_points is None:
+            rows = [gain_table]
+            self._battery_points = None
+        else:
+            rows = gain_table
+            self._battery_points = array('f', battery_points)
+            if board is None:
+                from .board import Board
+                board = Board.get_default_board()
+        if len(rows) != (1 if battery_points is None else len(battery_points)):
+            raise Exception("Gain table needs one row per battery point")
+        # Flattened as [row][operating point][kp, ki, kd]
+        flat = []
+        for row in rows:
+            if len(row) != len(operating_points):
+                raise Exception("Gain table needs one entry per operating point")
+            for gains in row:
+                flat.extend(gains)
+        self._gains = array('f', flat)
+        # Interpolated kp, ki and kd, preallocated so that scheduling on every update doesn't allocate a list
+        self._scheduled = array('f', [0, 0, 0])
+
+        self.board = board
+        self.battery_period = battery_period
+        self.battery = None
+        self._battery_time = None
+        self.operating_point = None
+        self._schedule()
+
+    def set_operating_point(self, operating_point: float = None):
+        """
+        Sets the operating point the gains are looked up at, e.g. the commanded effort or speed of the move.
+        Call with no parameters to use max_output instead, so moves that set max_output are scheduled automatically
+
+        :param operating_point: The operating point, in the units of operating_points
+        :type operating_point: float
+        """
+        self.operating_point = operating_point
+
+    def read_battery(self) -> float:
+        """
+        Reads the battery, smoothed with a moving average so that brief dips under load don't swing the gains
+
+        :return: The smoothed battery reading, as a raw Board.on_switch reading
+        :rtype: float
+        """
+        reading = self.board.on_switch.read_u16()
+        if self.battery is None:
+            self.battery = reading
+        else:
+            self.battery += 0.2 * (reading - self.battery)
+        return self.battery
+
+    def update(self, error: float, debug: bool = False, dt: float = None) -> float:
+        self._schedule()
+        return super().update(error, debug, dt)
+
+    def _schedule(self):
+        """
+        Non-api method; interpolates kp, ki and kd for the current operating point and battery reading
+        """
+        point = self.max_output if self.operating_point is None else abs(self.operating_point)
+        op_position = self._locate(self._operating_points, point)
+        op_index = int(op_position)
+        op_fraction = op_position - op_index
+
+        row = 0
+        row_fraction = 0
+        if self._battery_points is not None:
+            now = time.ticks_ms()
+            if self._battery_time is None or time.ticks_diff(now, self._battery_time) >= self.battery_period * 1000:
+                self._battery_time = now
+                self.read_battery()
+            row_position = self._locate(self._battery_points, self.battery)
+            row = int(row_position)
+            row_fraction = row_position - row
+
+        count = len(self._operating_points)
+        gains = self._gains
+        values = self._scheduled
+        for i in range(3):
+            low = row * count * 3 + op_index * 3 + i
+            value = gains[low]
+            if op_fraction > 0:
+                value += op_fraction * (gains[low + 3] - value)
+            if row_fraction > 0:
+                high = low + count * 3
+                other = gains[high]
+                if op_fraction > 0:
+                    other += op_fraction * (gains[high + 3] - other)
+                value += row_fraction * (other - value)
+            values[i] = value
+        ki = values[1]
+        if ki != self.ki and ki != 0 and self.ki != 0:
+            # Rescale the integral so that the integral term, and so the output, doesn't jump when ki changes
+            self.prev_integral *= self.ki / ki
+        self.kp = values[0]
+        self.ki = ki
+        self.kd = values[2]
+
+    @staticmethod
+    def _locate(points, value: float) -> float:
+        """
+        Non-api method; finds where value falls in the table, as the index of the point at or below it
+        plus how far it is towards the next point, so that no tuple is built
+        """
+        if value <= points[0]:
+            return 0
+        last = len(points) - 1
+        if value >= points[last]:
+            return last
+        index = 0
+        while points[index + 1] <= value:
+            index += 1
+        return index + (value - points[index]) / (points[index + 1] - points[index])
@@ -9,7 +9,8 @@ try:
 except (TypeError, ModuleNotFoundError):
     # Import wrapped in a try/except so that autodoc generation can process properly
     pass
-from machine import I2C, Pin, Timer, disable_irq, enable_irq
+from machine import I2C, Pin, disable_irq, enable_irq
+from .scheduler import Scheduler
 import time, math
 
 class IMU():
@@ -52,8 +53,9 @@ class IMU():
         self.reg_ctrl2_g_bits    = struct(addressof(self.reg_ctrl2_g_byte), LSM_REG_LAYOUT_CTRL2_G)
         self.reg_ctrl3_c_bits    = struct(addressof(self.reg_ctrl3_c_byte), LSM_REG_LAYOUT_CTRL3_C)
 
-        # Create timer
-        self.update_timer = Timer(-1)
+        # Integration runs on the shared scheduler, started once the gyro rate is set
+        self._update_task = None
+        self._update_period = 0
 
         # Check if the IMU is connected
         if not self.is_connected():
@@ -534,17 +536,26 @@ class IMU():
         self._start_timer()
 
     def _start_timer(self):
-        self.update_timer.init(freq=self.timer_frequency, callback=lambda t:self._update_imu_readings())
+        # The scheduler works in whole milliseconds, so integrate over the period it will actually run at
+        period_ms = max(1, round(1000 / self.timer_frequency))
+        self._update_period = period_ms / 1000
+        scheduler = Scheduler.get_default_scheduler()
+        if self._update_task is None:
+            self._update_task = scheduler.add_task(self._update_imu_readings, period_ms)
+        else:
+            scheduler.set_task_period(self._update_task, period_ms)
 
     def _stop_timer(self):
-        self.update_timer.deinit()
+        if self._update_task is not None:
+            Scheduler.get_default_scheduler().remove_task(self._update_task)
+            self._update_task = None
 
     def _update_imu_readings(self):
-        # Called every tick through a callback timer
+        # Called every tick through the scheduler
         self.get_gyro_rates()
-        delta_pitch = self.irq_v[1][0] / 1000 / self.timer_frequency
-        delta_roll = self.irq_v[1][1] / 1000 / self.timer_frequency
-        delta_yaw = self.irq_v[1][2] / 1000 / self.timer_frequency
+        delta_pitch = self.irq_v[1][0] / 1000 * self._update_period
+        delta_roll = self.irq_v[1][1] / 1000 * self._update_period
+        delta_yaw = self.irq_v[1][2] / 1000 * self._update_period
 
         state = disable_irq()
         self.running_pitch += delta_pitch
@@ -0,0 +1,179 @@
+from array import array
+import math
+
+class MotionProfile:
+
+    def __init__(self, segments: list, dt: float = 0.02, sign: int = 1):
+        """
+        A time-parameterized move, precomputed into position, velocity and acceleration arrays sampled every dt seconds.
+        Build one with MotionProfile.trapezoidal or MotionProfile.s_curve rather than calling this directly.
+        Units are whatever distance unit the profile was made with (e.g. cm for a drivetrain, revolutions for a motor), per second.
+
+        :param segments: The pieces of the move, as (duration, starting acceleration, jerk) tuples
+        :type segments: list<tuple<float>>
+        :param dt: The time between samples, in seconds
+        :type dt: float
+        :param sign: 1 for a forward move, -1 to mirror it backwards
+        :type sign: int
+        """
+        self.dt = dt
+        self.duration = 0
+        for segment in segments:
+            self.duration += segment[0]
+        length = int(math.ceil(self.duration / dt)) + 1
+        self.positions = array('f', [0] * length)
+        self.velocities = array('f', [0] * length)
+        self.accelerations = array('f', [0] * length)
+
+        # Walk through the segments, evaluating each sample in closed form from the segment's starting state
+        position = 0
+        velocity = 0
+        segment_start = 0
+        index = 0
+        for duration, acceleration, jerk in segments:
+            segment_end = segment_start + duration
+            while index < length and index * dt <= segment_end:
+                tau = index * dt - segment_start
+                self.positions[index] = sign * (position + velocity * tau + acceleration * tau * tau / 2 + jerk * tau * tau * tau / 6)
+                self.velocities[index] = sign * (velocity + acceleration * tau + jerk * tau * tau / 2)
+                self.accelerations[index] = sign * (acceleration + jerk * tau)
+                index += 1
+            position += velocity * duration + acceleration * duration * duration / 2 + jerk * duration * duration * duration / 6
+            velocity += acceleration * duration + jerk * duration * duration / 2
+            segment_start = segment_end
+        # Anything past the last segment (and always the last sample) is at rest at the end of the move
+        index = min(index, length - 1)
+        while index < length:
+            self.positions[index] = sign * position
+            self.velocities[index] = 0
+            self.accelerations[index] = 0
+            index += 1
+
+    @classmethod
+    def trapezoidal(cls, distance: float, max_velocity: float, max_acceleration: float, dt: float = 0.02):
+        """
+        Accelerate at max_acceleration up to max_velocity, cruise, then decelerate to a stop.
+        If the move is too short to reach max_velocity, the velocity peaks partway instead.
+
+        :param distance: The distance to move. Can be negative
+        :type distance: float
+        :param max_velocity: The cruising velocity, in distance per second
+        :type max_velocity: float
+        :param max_acceleration: The acceleration and deceleration, in distance per second squared
+        :type max_acceleration: float
+        :param dt: The time between samples, in seconds
+        :type dt: float
+        :rtype: MotionProfile
+        """
+        sign = -1 if distance < 0 else 1
+        distance = abs(distance)
+        max_velocity = abs(max_velocity)
+        max_acceleration = abs(max_acceleration)
+        if distance < max_velocity * max_velocity / max_acceleration:
+            # Triangle: never reaches max_velocity
+            max_velocity = math.sqrt(distance * max_acceleration)
+        accel_time = max_velocity / max_acceleration if max_acceleration > 0 else 0
+        cruise_time = (distance - max_velocity * accel_time) / max_velocity if max_velocity > 0 else 0
+        return cls([
+            (accel_time, max_acceleration, 0),
+            (max(0, cruise_time), 0, 0),
+            (accel_time, -max_acceleration, 0),
+        ], dt, sign)
+
+    @classmethod
+    def s_curve(cls, distance: float, max_velocity: float, max_acceleration: float, max_jerk: float, dt: float = 0.02):
+        """
+        Like a trapezoidal profile, but the acceleration also ramps up and down at max_jerk instead of switching instantly.
+        Smoother on the mechanism, at the cost of a slightly longer move.
+
+        :param distance: The distance to move. Can be negative
+        :type distance: float
+        :param max_velocity: The cruising velocity, in distance per second
+        :type max_velocity: float
+        :param max_acceleration: The peak acceleration, in distance per second squared
+        :type max_acceleration: float
+        :param max_jerk: The rate acceleration changes at, in distance per second cubed
+        :type max_jerk: float
+        :param dt: The time between samples, in seconds
+        :type dt: float
+        :rtype: MotionProfile
+        """
+        sign = -1 if distance < 0 else 1
+        distance = abs(distance)
+        max_velocity = abs(max_velocity)
+        max_acceleration = abs(max_acceleration)
+        max_jerk = abs(max_jerk)
+
+        def ramp(velocity):
+            # Jerk time, constant acceleration time, and peak acceleration to go from rest to velocity
+            if velocity * max_jerk < max_acceleration * max_acceleration:
+                peak = math.sqrt(velocity * max_jerk)
+                return peak / max_jerk, 0, peak
+            return max_acceleration / max_jerk, velocity / max_acceleration - max_acceleration / max_jerk, max_acceleration
+
+        jerk_time, accel_time, peak = ramp(max_velocity)
+        # Speeding up (and slowing down) covers velocity * ramp time / 2 each, by symmetry
+        if max_velocity * (2 * jerk_time + accel_time) > distance:
+            # Too short to reach max_velocity, so search for the peak velocity that exactly fits
+            low = 0
+            high = max_velocity
+            for _ in range(30):
+                middle = (low + high) / 2
+                jerk_time, accel_time, peak = ramp(middle)
+                if middle * (2 * jerk_time + accel_time) > distance:
+                    high = middle
+                else:
+                    low = middle
+            max_velocity = low
+            jerk_time, accel_time, peak = ramp(max_velocity)
+        cruise_time = (distance - max_velocity * (2 * jerk_time + accel_time)) / max_velocity if max_velocity > 0 else 0
+        jerk = peak / jerk_time if jerk_time > 0 else 0
+        return cls([
+            (jerk_time, 0, jerk),
+            (accel_time, peak, 0),
+            (jerk_time, peak, -jerk),
+            (max(0, cruise_time), 0, 0),
+            (jerk_time, 0, -jerk),
+            (accel_time, -peak, 0),
+            (jerk_time, -peak, jerk),
+        ], dt, sign)
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def get_duration(self) -> float:
+        """
+        :return: How long the move takes, in seconds
+        :rtype: float
+        """
+        return self.duration
+
+    def get_distance(self) -> float:
+        """
+        :return: The total distance of the move
+        :rtype: float
+        """
+        return self.positions[len(self.positions) - 1]
+
+    def index_at(self, t: float) -> int:
+        """
+        :param t: Time since the start of the move, in seconds
+        :type t: float
+        :return: The index of the sample at that time, clamped to the end of the move
+        :rtype: int
+        """
+        index = int(t / self.dt)
+        if index < 0:
+            return 0
+        last = len(self.positions) - 1
+        return index if index < last else last
+
+    def sample(self, t: float) -> tuple:
+        """
+        :param t: Time since the start of the move, in seconds
+        :type t: float
+        :return: The position, velocity and acceleration at that time
+        :rtype: tuple<float>
+        """
+        index = self.index_at(t)
+        return self.positions[index], self.velocities[index], self.accelerations[index]
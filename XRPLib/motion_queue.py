@@ -0,0 +1,231 @@
+from .scheduler import Scheduler
+import uasyncio as asyncio
+import math
+import time
+
+class MotionQueue:
+
+    def __init__(self, drivetrain, max_speed: float = 30, max_acceleration: float = 40, min_speed: float = 3, update_rate: float = 50):
+        """
+        Runs straight, turn and arc segments back-to-back in the background, without stopping between them where the robot doesn't have to.
+        Speed carries over from one segment into the next as long as neither wheel has to change direction (e.g. straight into a gentle arc,
+        or two turns the same way), and the robot only slows down for segments it can't carry speed into, or for the end of the queue.
+        Segments can be added while the queue is running.
+
+        Speeds and accelerations are those of the faster (outer) wheel, and each wheel is regulated by its own speed control,
+        so the motors' speed controllers should be tuned.
+
+        :param drivetrain: The drivetrain to move
+        :type drivetrain: DifferentialDrive
+        :param max_speed: The fastest either wheel may go (In Centimeters per Second)
+        :type max_speed: float
+        :param max_acceleration: How fast either wheel may speed up or slow down (In Centimeters per Second squared)
+        :type max_acceleration: float
+        :param min_speed: The slowest the robot crawls at while finishing a segment (In Centimeters per Second)
+        :type min_speed: float
+        :param update_rate: How often the queue updates, in Hz
+        :type update_rate: float
+        """
+        self.drivetrain = drivetrain
+        self.max_speed = max_speed
+        self.max_acceleration = max_acceleration
+        self.min_speed = min_speed
+        self._period_ms = max(1, round(1000 / update_rate))
+
+        # Separate from the drivetrain's bank, since this one is read from the scheduler
+        self._encoder_bank = drivetrain._make_encoder_bank()
+
+        # Each segment is (left wheel ratio, right wheel ratio, outer wheel distance), with the larger ratio magnitude being 1
+        self._segments = []
+        self._current = 0
+        self._speed = 0
+        self._exit_speed = 0
+        self._progress = 0
+        self._start_left = 0
+        self._start_right = 0
+        self._prev_time = 0
+        self._task = None
+
+        self.segments_done = 0
+        # Called with the index of each segment as it finishes, from the background loop, so it should be quick
+        self.on_segment_done = None
+
+    def straight(self, distance: float) -> int:
+        """
+        Adds a straight segment to the queue
+
+        :param distance: The distance to travel (In Centimeters), negative to drive backwards
+        :type distance: float
+        :return: The index of the segment, as passed to on_segment_done
+        :rtype: int
+        """
+        return self._add(distance, distance)
+
+    def turn(self, turn_degrees: float) -> int:
+        """
+        Adds a turn in place to the queue
+
+        :param turn_degrees: The angle to turn (In Degrees), counterclockwise positive
+        :type turn_degrees: float
+        :return: The index of the segment, as passed to on_segment_done
+        :rtype: int
+        """
+        wheel_distance = math.radians(turn_degrees) * self.drivetrain.track_width / 2
+        return self._add(-wheel_distance, wheel_distance)
+
+    def arc(self, radius: float, angle: float) -> int:
+        """
+        Adds an arc to the queue
+
+        :param radius: The radius of the arc, measured to the center of the robot (In Centimeters). Positive curves left, negative curves right
+        :type radius: float
+        :param angle: How far around the circle to drive (In Degrees), negative to drive backwards
+        :type angle: float
+        :return: The index of the segment, as passed to on_segment_done
+        :rtype: int
+        """
+        if radius == 0:
+            return self.turn(angle)
+        distance = abs(radius) * math.radians(angle)
+        half_track = self.drivetrain.track_width / 2
+        return self._add(distance * (1 - half_track / radius), distance * (1 + half_track / radius))
+
+    def is_done(self) -> bool:
+        """
+        :return: if every segment added so far has finished
+        :rtype: bool
+        """
+        return self._current >= len(self._segments)
+
+    def get_progress(self) -> tuple:
+        """
+        :return: The index of the segment running, and how far through it the robot is, from 0 to 1
+        :rtype: tuple
+        """
+        if self.is_done():
+            return self._current, 1
+        return self._current, self._progress / self._segments[self._current][2]
+
+    def wait(self, timeout: float = None) -> bool:
+        """
+        Waits for every segment to finish
+
+        :param timeout: The amount of time to wait (In Seconds), or None to wait forever. The queue keeps running after a timeout
+        :type timeout: float
+        :return: if the queue finished before the timeout
+        :rtype: bool
+        """
+        start = time.ticks_ms()
+        while not self.is_done():
+            if timeout is not None and time.ticks_diff(time.ticks_ms(), start) > timeout * 1000:
+                return False
+            time.sleep(0.01)
+        return True
+
+    async def wait_async(self):
+        """
+        Awaitable version of wait. Cancelling the waiting task cancels the queue too
+        """
+        try:
+            while not self.is_done():
+                await asyncio.sleep(0.01)
+        finally:
+            self.cancel()
+
+    def cancel(self):
+        """
+        Drops every segment that hasn't finished and stops the drivetrain
+        """
+        self._stop_task()
+        self._current = len(self._segments)
+        self._speed = 0
+        self.drivetrain.stop()
+
+    def _add(self, left_distance: float, right_distance: float) -> int:
+        """
+        Non-api method; queues a segment given how far each wheel travels
+        """
+        outer = max(abs(left_distance), abs(right_distance))
+        index = len(self._segments)
+        if outer == 0:
+            # Nothing to do, but still report it as done in order
+            self._segments.append((1, 1, 0))
+        else:
+            self._segments.append((left_distance / outer, right_distance / outer, outer))
+        if self._task is None:
+            self._start_segment()
+            self._prev_time = time.ticks_us()
+            self._task = Scheduler.get_default_scheduler().add_task(self._update, self._period_ms)
+        else:
+            self._plan()
+        return index
+
+    def _stop_task(self):
+        if self._task is not None:
+            Scheduler.get_default_scheduler().remove_task(self._task)
+            self._task = None
+
+    def _start_segment(self):
+        """
+        Non-api method; measures the segment now running from where the wheels are
+        """
+        self._start_left, self._start_right = self._read_positions()
+        self._progress = 0
+        self._plan()
+
+    def _read_positions(self) -> tuple:
+        """
+        Non-api method; reads both wheel positions in cm from one snapshot
+        """
+        return self.drivetrain._read_encoder_positions(self._encoder_bank)
+
+    def _plan(self):
+        """
+        Non-api method; finds the fastest the robot may leave the current segment at, while still being able to slow down for everything queued after it
+        """
+        current = self._current
+        segments = self._segments
+        speed = 0
+        for index in range(len(segments) - 1, current, -1):
+            speed = min(self.max_speed, math.sqrt(speed * speed + 2 * self.max_acceleration * segments[index][2]))
+            # Speed can only carry across the boundary if neither wheel has to reverse
+            previous = segments[index - 1]
+            following = segments[index]
+            if previous[0] * following[0] <= 0 or previous[1] * following[1] <= 0:
+                speed = 0
+        # The background loop may have moved on while this was being worked out
+        if current == self._current:
+            self._exit_speed = speed
+
+    def _update(self):
+        """
+        Non-api method; drives the current segment, moving on to the next when it finishes
+        """
+        now = time.ticks_us()
+        dt = time.ticks_diff(now, self._prev_time) / 1000000
+        self._prev_time = now
+
+        while True:
+            if self.is_done():
+                self._stop_task()
+                self._speed = 0
+                self.drivetrain.stop()
+                return
+            left_ratio, right_ratio, length = self._segments[self._current]
+            left, right = self._read_positions()
+            # Distance of the outer wheel along the segment, from both wheels' travel
+            self._progress = ((left - self._start_left) * left_ratio + (right - self._start_right) * right_ratio) / (left_ratio * left_ratio + right_ratio * right_ratio)
+            remaining = length - self._progress
+            if remaining > 0:
+                break
+            index = self._current
+            self._current += 1
+            self.segments_done += 1
+            if self.on_segment_done is not None:
+                self.on_segment_done(index)
+            self._start_segment()
+
+        speed = min(self.max_speed, self._speed + self.max_acceleration * dt, math.sqrt(self._exit_speed ** 2 + 2 * self.max_acceleration * remaining))
+        speed = max(speed, self.min_speed)
+        self._speed = speed
+        self.drivetrain.set_speed(speed * left_ratio, speed * right_ratio)
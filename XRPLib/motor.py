@@ -1,16 +1,52 @@
 from machine import Pin, PWM
+import math
 class Motor:
 
     """
     A wrapper class handling direction and power sets for DC motors on the XRP robots
     """
 
-    def __init__(self, direction_pin: int, speed_pin: int, flip_dir:bool=False):
+    def __init__(self, direction_pin: int, speed_pin: int, flip_dir:bool=False, pwm_freq:int=50, min_pulse_ns:int=0):
+        """
+        :param direction_pin: The pin that sets the direction of the motor
+        :type direction_pin: int
+        :param speed_pin: The PWM pin that sets the power of the motor
+        :type speed_pin: int
+        :param flip_dir: If True, positive effort turns the motor the other way
+        :type flip_dir: bool
+        :param pwm_freq: The PWM frequency in Hz. Higher frequencies (e.g. 20000) give smoother, quieter torque at low speed
+        :type pwm_freq: int
+        :param min_pulse_ns: If the motor driver ignores pulses shorter than this many nanoseconds, small nonzero efforts are raised to this pulse width,
+            so the bottom of the effort range isn't dead at high PWM frequencies. Measure the driver before setting it. Defaults to 0, no minimum
+        :type min_pulse_ns: int
+        """
         self._dirPin = Pin(direction_pin, Pin.OUT)
         self._speedPin = PWM(Pin(speed_pin, Pin.OUT))
-        self._speedPin.freq(50)
         self.flip_dir = flip_dir
         self._MAX_PWM = 65534 # Motor holds when actually at full power
+        self._min_pulse_ns = min_pulse_ns
+        # Last values written to the hardware, so that repeated sets of the same effort don't touch the pins.
+        # The direction pin is cached by its level, so a change to flip_dir is still written
+        self._last_direction_level = None
+        self._last_duty = None
+        self.set_pwm_frequency(pwm_freq)
+
+    def set_pwm_frequency(self, pwm_freq: int):
+        """
+        Sets the PWM frequency of the motor, and adjusts how effort maps to duty cycle to match
+
+        :param pwm_freq: The PWM frequency in Hz
+        :type pwm_freq: int
+        :param min_pulse_ns: If the motor driver ignores pulses shorter than this many nanoseconds, small nonzero efforts are raised to this pulse width,
+            so the bottom of the effort range isn't dead at high PWM frequencies. Measure the driver before setting it. Defaults to 0, no minimum
+        :type min_pulse_ns: int
+        """
+        self._speedPin.freq(pwm_freq)
+        self.pwm_freq = pwm_freq
+        # The shortest pulse the driver responds to is a larger share of the period at higher frequencies
+        self._min_duty = min(self._MAX_PWM, math.ceil(self._min_pulse_ns * pwm_freq * 65535 / 1000000000))
+        # Force the next set_effort to write to the hardware
+        self._last_duty = None
 
     def set_effort(self, effort: float):
         """
@@ -23,12 +59,23 @@ class Motor:
         if effort < 0:
             # Change direction if negative power
             effort *= -1
-            self._set_direction(1)
+            direction = 1
         else:
-            self._set_direction(0)
+            direction = 0
+        level = direction ^ self.flip_dir
+        if level != self._last_direction_level:
+            self._set_direction(direction)
+            self._last_direction_level = level
         # Cap power to [0,1]
         effort = max(0,min(effort,1))
-        self._speedPin.duty_u16(int(effort*self._MAX_PWM))
+        if effort == 0:
+            duty = 0
+        else:
+            # Map (0, 1] onto the duty range the driver can actually produce
+            duty = int(self._min_duty + effort*(self._MAX_PWM - self._min_duty))
+        if duty != self._last_duty:
+            self._speedPin.duty_u16(duty)
+            self._last_duty = duty
 
     def _set_direction(self, direction: int):
         if self.flip_dir:
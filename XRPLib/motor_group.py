@@ -1,13 +1,37 @@
 from .encoded_motor import EncodedMotor
+from .encoder import Encoder
+from .controller import Controller
+from .motion_profile import MotionProfile
+from .scheduler import Scheduler
+from array import array
+import time
+
 class MotorGroup(EncodedMotor):
-    def __init__(self, *motors: EncodedMotor):
+    def __init__(self, *motors: EncodedMotor, update_rate: float = 50, sync_gain: float = 0.002):
         """
         A wrapper class for multiple motors, allowing them to be treated as one motor.
-        
+        The group samples every member's encoder once per update and runs one speed (or position) controller for all of them,
+        plus a cross-coupling correction that keeps the members moving together under uneven load.
+        While a motor is in a group, the group runs its updates instead of the motor's own.
+
         :param motors: The motors to add to this group
         :type motors: tuple<EncodedMotor>
-        """
+        :param update_rate: How often the group updates, in Hz (50 to 1000). Defaults to 50 Hz
+        :type update_rate: float
+        :param sync_gain: Effort added per encoder count a member is behind the group average
+        :type sync_gain: float
+        """
+        self.sync_gain = sync_gain
+        # Every member's encoder has the same resolution
+        self._resolution = Encoder.resolution
+        # The members and their per-member arrays, replaced together as one tuple so an update always sees a matching set
+        self._members = ([], array('b'), array('i'), array('i'))
         self.motors = []
+        # Sum of the members' positions in counts, kept as an integer for the velocity estimator, and their average
+        self._position_sum = 0
+        self._position = 0
+        self._init_control(update_rate)
+
         for motor in motors:
             self.add_motor(motor)
 
@@ -16,17 +40,64 @@ class MotorGroup(EncodedMotor):
         :param motor: The motor to add to this group
         :type motor: EncodedMotor
         """
-        self.motors.append(motor)
+        motor.set_speed()
+        # The group reads this motor's encoder itself, so stop the motor's own updates
+        Scheduler.get_default_scheduler().remove_task(motor._update_task)
+        self._rebuild(self.motors + [motor])
 
     def remove_motor(self, motor:EncodedMotor):
         """
         :param motor: The motor to remove from this group
         :type motor: EncodedMotor
         """
-        try:
-            self.motors.remove(motor)
-        except:
+        if motor not in self.motors:
             print("Failed to remove motor from Motor Group")
+            return
+        self._rebuild([m for m in self.motors if m is not motor])
+        motor._update_task = Scheduler.get_default_scheduler().add_task(motor._update, motor._update_task.period_ms)
+
+    def _rebuild(self, motors: list):
+        """
+        Non-api method; resizes the per-member arrays and caches each member's direction.
+        The members and their arrays are swapped in with a single assignment, so a group update never sees a mismatch
+        """
+        count = len(motors)
+        members = (
+            motors,
+            array('b', [-1 if motor._motor.flip_dir else 1 for motor in motors]),
+            array('i', [0] * count),
+            array('i', [0] * count),
+        )
+        self._sample(members)
+        self._members = members
+        self.motors = motors
+        self.prev_position = self._position
+        self._prev_time = time.ticks_us()
+        self._reset_sync()
+        # The estimator works on the position sum, which jumps when the members change
+        if self._velocity_estimator is not None:
+            self._velocity_estimator.reset()
+
+    def _sample(self, members: tuple):
+        """
+        Non-api method; reads every member's encoder once, back-to-back
+        """
+        motors, signs, positions, _ = members
+        total = 0
+        for i in range(len(motors)):
+            position = motors[i]._encoder.get_position_counts() * signs[i]
+            positions[i] = position
+            total += position
+        self._position_sum = total
+        self._position = total / len(motors) if len(motors) > 0 else 0
+
+    def _reset_sync(self):
+        """
+        Non-api method; measures synchronization from where each member is now
+        """
+        _, _, positions, start_positions = self._members
+        for i in range(len(positions)):
+            start_positions[i] = positions[i]
 
     def set_effort(self, effort: float):
         """
@@ -35,60 +106,118 @@ class MotorGroup(EncodedMotor):
         """
         for motor in self.motors:
             motor.set_effort(effort)
-        
+
     def get_position(self) -> float:
         """
         :return: The average position of all motors in this group, in revolutions, relative to the last time reset was called.
         :rtype: float
         """
-        avg = 0
-        for motor in self.motors:
-            avg += motor.get_position()
-        return avg / len(self.motors)
+        return self._position / self._resolution
 
     def get_position_counts(self) -> int:
         """
         :return: The average position of all motors in this group, in encoder counts, relative to the last time reset was called.
         :rtype: int
         """
-        avg = 0
-        for motor in self.motors:
-            avg += motor.get_position_counts()
-        return round(avg / len(self.motors))
+        return round(self._position)
 
     def reset_encoder_position(self):
         """
         Resets the encoder position of all motors in this group back to zero.
         """
+        _, _, positions, start_positions = self._members
         for motor in self.motors:
             motor.reset_encoder_position()
+        for i in range(len(positions)):
+            positions[i] = 0
+            start_positions[i] = 0
+        self._position_sum = 0
+        self._position = 0
+        self.prev_position = 0
+        if self._velocity_estimator is not None:
+            self._velocity_estimator.reset()
 
-    def get_speed(self) -> float:
-        """
-        :return: The average speed of the motors, in rpm
-        :rtype: float
-        """
-        avg = 0
-        for motor in self.motors:
-            avg += motor.get_speed()
-        return avg / len(self.motors)
-
-
-    def set_speed(self, target_speed_rpm: float = None):
+    def set_speed(self, speed_rpm: float = None):
         """
         Sets target speed (in rpm) to be maintained passively by all motors in this group
         Call with no parameters to turn off speed control
 
-        :param target_speed_rpm: The target speed for these motors in rpm, or None
-        :type target_speed_rpm: float, or None
-        """
-        for motor in self.motors:
-            motor.set_speed(target_speed_rpm)
+        :param speed_rpm: The target speed for these motors in rpm, or None
+        :type speed_rpm: float, or None
+        """
+        was_running = self.target_speed is not None
+        super().set_speed(speed_rpm)
+        if not was_running:
+            # Keep the synchronization reference when the target changes on the fly
+            self._reset_sync()
 
-    def set_speed_controller(self, new_controller):
+    def set_position(self, target_position: float, max_effort: float = 0.5, max_speed: float = None, controller: Controller = None):
         """
-        :param new_controller: The new Controller for speed control
-        :type new_controller: Controller
+        Moves all motors in this group to a position and holds it in the background, keeping them together on the way.
+        See EncodedMotor.set_position
+
+        :param target_position: The average position to move to, in revolutions, relative to the last time reset was called
+        :type target_position: float
+        :param max_effort: The max effort to move with (Bounded from 0 to 1). Ignored if max_speed is given
+        :type max_effort: float
+        :param max_speed: If given, the position controller sets a target speed (in rpm, up to this value) instead of the effort
+        :type max_speed: float, or None
+        :param controller: The controller for the position error (in revolutions)
+        :type controller: Controller
+        """
+        super().set_position(target_position, max_effort, max_speed, controller)
+        self._reset_sync()
+
+    def follow_profile(self, profile: MotionProfile, scale: float = 1.0, max_correction: float = 60, controller: Controller = None):
         """
-        for motor in self.motors:
-            motor.set_speed_controller(new_controller)
\ No newline at end of file
+        Follows a motion profile in the background with all motors in this group, keeping them together on the way.
+        See EncodedMotor.follow_profile
+
+        :param profile: The profile to follow
+        :type profile: MotionProfile
+        :param scale: Revolutions per unit of distance in the profile, for profiles made in other units (e.g. cm)
+        :type scale: float
+        :param max_correction: The largest speed correction (in rpm) the position controller can add
+        :type max_correction: float
+        :param controller: The controller for the position error (in revolutions)
+        :type controller: Controller
+        """
+        super().follow_profile(profile, scale, max_correction, controller)
+        self._reset_sync()
+
+    def _update(self):
+        """
+        Non-api method; samples all members and updates their efforts for synchronized speed and position control
+        """
+        members = self._members
+        motors, _, positions, start_positions = members
+        count = len(motors)
+        if count == 0:
+            return
+        current_time = time.ticks_us()
+        dt = time.ticks_diff(current_time, self._prev_time) / 1000000
+        if dt <= 0:
+            return
+        self._prev_time = current_time
+        self._sample(members)
+        current_position = self._position
+        self.raw_speed = (current_position - self.prev_position) / dt
+        if self._velocity_estimator is not None:
+            # Estimators keep integer positions, so they get the sum of the members' counts and the result is scaled back down
+            self.speed = self._velocity_estimator.update(self._position_sum, self.raw_speed * count, dt) / count
+        else:
+            self.speed = self.raw_speed
+        self.prev_position = current_position
+
+        effort = self._control(current_time, current_position, dt)
+        if effort is None:
+            return
+        # Average distance travelled since control started
+        average_progress = 0
+        for i in range(count):
+            average_progress += positions[i] - start_positions[i]
+        average_progress /= count
+        # Members that are behind the average get more effort in the direction of travel, members ahead get less
+        for i in range(count):
+            lag = average_progress - (positions[i] - start_positions[i])
+            motors[i]._motor.set_effort(effort + self.sync_gain * lag)
@@ -0,0 +1,135 @@
+from .scheduler import Scheduler
+import math
+import time
+
+class Odometry:
+
+    def __init__(self, drivetrain, use_imu: bool = True, update_rate: float = 50):
+        """
+        Tracks the position and heading of a differential drive robot in the background, starting from (0, 0) facing along the x axis.
+        Each update treats the motion since the last one as an arc, which is exact for constant wheel speeds.
+        Distance comes from the wheel encoders, and heading comes from the IMU when there is one, since it doesn't drift with wheel slip.
+
+        :param drivetrain: The drivetrain to track
+        :type drivetrain: DifferentialDrive
+        :param use_imu: Whether to use the drivetrain's IMU for heading, if it has one. Otherwise heading comes from the encoders and track width
+        :type use_imu: bool
+        :param update_rate: How often the pose is updated, in Hz
+        :type update_rate: float
+        """
+        self.drivetrain = drivetrain
+        self.imu = drivetrain.imu if use_imu else None
+
+        # Separate from the drivetrain's bank, since this one is read from the scheduler
+        self._encoder_bank = drivetrain._make_encoder_bank()
+
+        # (x, y, heading in radians), replaced as a whole so a snapshot is never half-updated
+        self._pose = (0.0, 0.0, 0.0)
+        self.linear_speed = 0
+        self.angular_speed = 0
+        self._heading_offset = 0
+        self._prev_left, self._prev_right = self._read_positions()
+        self._prev_heading = self._read_heading()
+        self._prev_time = time.ticks_us()
+
+        self._update_task = Scheduler.get_default_scheduler().add_task(self._update, max(1, round(1000 / update_rate)))
+
+    def get_pose(self) -> tuple:
+        """
+        :return: The x and y position of the robot (In Centimeters) and its heading (In Degrees, counterclockwise positive)
+        :rtype: tuple<float>
+        """
+        x, y, theta = self._pose
+        return x, y, math.degrees(theta)
+
+    def get_pose_radians(self) -> tuple:
+        """
+        :return: The x and y position of the robot (In Centimeters) and its heading (In Radians, counterclockwise positive)
+        :rtype: tuple<float>
+        """
+        return self._pose
+
+    def get_velocity(self) -> tuple:
+        """
+        :return: The forward speed of the robot (In Centimeters per Second) and its turn rate (In Degrees per Second) over the last update
+        :rtype: tuple<float>
+        """
+        return self.linear_speed, math.degrees(self.angular_speed)
+
+    def set_pose(self, x: float = 0, y: float = 0, heading: float = 0):
+        """
+        Sets where the robot currently is. Call with no parameters to make the current position the origin
+
+        :param x: The x position (In Centimeters)
+        :type x: float
+        :param y: The y position (In Centimeters)
+        :type y: float
+        :param heading: The heading (In Degrees, counterclockwise positive)
+        :type heading: float
+        """
+        theta = math.radians(heading)
+        self._prev_left, self._prev_right = self._read_positions()
+        if self.imu is not None:
+            self._heading_offset = 0
+            self._heading_offset = theta - self._read_heading()
+        self._prev_heading = theta
+        self._pose = (x, y, theta)
+
+    def stop(self):
+        """
+        Stops tracking. The last pose is kept
+        """
+        Scheduler.get_default_scheduler().remove_task(self._update_task)
+
+    def _read_positions(self) -> tuple:
+        """
+        Non-api method; reads both wheel positions in cm from one snapshot
+        """
+        return self.drivetrain._read_encoder_positions(self._encoder_bank)
+
+    def _read_heading(self) -> float:
+        """
+        Non-api method; reads the IMU heading in radians, or None without an IMU
+        """
+        if self.imu is None:
+            return None
+        return math.radians(self.imu.get_yaw()) + self._heading_offset
+
+    def _update(self):
+        """
+        Non-api method; integrates the motion since the last update
+        """
+        now = time.ticks_us()
+        dt = time.ticks_diff(now, self._prev_time) / 1000000
+        if dt <= 0:
+            return
+        self._prev_time = now
+
+        left, right = self._read_positions()
+        delta_left = left - self._prev_left
+        delta_right = right - self._prev_right
+        self._prev_left = left
+        self._prev_right = right
+
+        x, y, theta = self._pose
+        distance = (delta_left + delta_right) / 2
+        heading = self._read_heading()
+        if heading is None:
+            delta_theta = (delta_right - delta_left) / self.drivetrain.track_width
+            heading = theta + delta_theta
+        else:
+            delta_theta = heading - self._prev_heading
+        self._prev_heading = heading
+
+        if abs(delta_theta) < 1e-6:
+            # Straight line, where the arc formula divides by zero
+            x += distance * math.cos(theta)
+            y += distance * math.sin(theta)
+        else:
+            radius = distance / delta_theta
+            x += radius * (math.sin(heading) - math.sin(theta))
+            y -= radius * (math.cos(heading) - math.cos(theta))
+
+        self._pose = (x, y, heading)
+        self.linear_speed = distance / dt
+        self.angular_speed = delta_theta / dt
@@ -7,6 +7,8 @@ PID controller with exit condition
 
 class PID(Controller):
 
+    accepts_dt = True
+
     def __init__(self,
                  kp = 1.0,
                  ki = 0.0,
@@ -16,7 +18,10 @@ class PID(Controller):
                  max_derivative = None,
                  max_integral = None,
                  tolerance = 0.1,
-                 tolerance_count = 1
+                 tolerance_count = 1,
+                 derivative_on_measurement = False,
+                 derivative_filter = 0.0,
+                 anti_windup_gain = 0.0
                  ):
         """
         :param kp: proportional gain
@@ -28,6 +33,9 @@ class PID(Controller):
         :param max_integral: maximum integral windup allowed (will cap integral at this value)
         :param tolerance: tolerance for exit condition
         :param tolerance_count: number of times the error needs to be within tolerance for is_done to return True
+        :param derivative_on_measurement: take the derivative of the measurement instead of the error, so setpoint changes don't cause a spike
+        :param derivative_filter: time constant (in seconds) of a low-pass filter on the derivative term, 0 for no filtering
+        :param anti_windup_gain: how fast (per second) the integral is pulled back while the output is saturated at max_output, 0 to disable
         """
         self.kp = kp
         self.ki = ki
@@ -38,10 +46,18 @@ class PID(Controller):
         self.max_integral = max_integral
         self.tolerance = tolerance
         self.tolerance_count = tolerance_count
+        self.derivative_on_measurement = derivative_on_measurement
+        self.derivative_filter = derivative_filter
+        self.anti_windup_gain = anti_windup_gain
 
         self.prev_error = 0
         self.prev_integral = 0
         self.prev_output = 0
+        self.prev_derivative = 0
+
+        # The measurement is only known relative to the setpoint, which is 0 unless set_target is called
+        self.setpoint = 0
+        self.prev_measurement = None
 
         self.start_time = None
         self.prev_time = None
@@ -57,24 +73,32 @@ class PID(Controller):
             # otherwise, reset times in tolerance, because we need to be in tolerance for numTimesInTolerance consecutive times
             self.times = 0
 
-    def update(self, error: float, debug: bool = False) -> float:
+    def update(self, error: float, debug: bool = False, dt: float = None) -> float:
         """
         Handle a new update of this PID loop given an error.
 
         :param error: The error of the system being controlled by this PID controller
         :type error: float
+        :param dt: The time since the last update in seconds. If None, it is measured from the clock
+        :type dt: float
 
         :return: The system output from the controller, to be used as an effort value or for any other purpose
         :rtype: float
         """
-        current_time = time.ticks_ms()
-        if self.prev_time is None:
+        current_time = time.ticks_us()
+        if dt is not None and dt > 0:
+            # caller knows the true timestep
+            timestep = dt
+        elif self.prev_time is None:
             # First update after instantiation
-            self.start_time = current_time
             timestep = 0.01
         else:
             # get time delta in seconds
-            timestep = time.ticks_diff(current_time, self.prev_time) / 1000
+            timestep = time.ticks_diff(current_time, self.prev_time) / 1000000
+            if timestep <= 0:
+                timestep = 0.01
+        if self.prev_time is None:
+            self.start_time = current_time
         self.prev_time = current_time # cache time for next update
 
         self._handle_exit_condition(error)
@@ -84,10 +108,34 @@ class PID(Controller):
         if self.max_integral is not None:
             integral = max(-self.max_integral, min(self.max_integral, integral))
 
-        derivative = (error - self.prev_error) / timestep
+        if self.derivative_on_measurement:
+            measurement = self.setpoint - error
+            if self.prev_measurement is None:
+                # No history yet, so there is no derivative
+                derivative = 0
+            else:
+                # With a fixed setpoint, d(error)/dt = -d(measurement)/dt
+                derivative = -(measurement - self.prev_measurement) / timestep
+            self.prev_measurement = measurement
+        else:
+            derivative = (error - self.prev_error) / timestep
+
+        if self.derivative_filter > 0:
+            # First order low-pass filter
+            alpha = timestep / (self.derivative_filter + timestep)
+            derivative = self.prev_derivative + alpha * (derivative - self.prev_derivative)
+        self.prev_derivative = derivative
 
         # derive output
         output = self.kp * error + self.ki * integral + self.kd * derivative
+
+        if self.anti_windup_gain > 0 and self.ki != 0:
+            # Back-calculation: while the output is past max_output, bleed off the integral by the excess
+            saturated = max(-self.max_output, min(self.max_output, output))
+            integral += self.anti_windup_gain * (saturated - output) / self.ki * timestep
+            if self.max_integral is not None:
+                integral = max(-self.max_integral, min(self.max_integral, integral))
+
         self.prev_error = error
         self.prev_integral = integral
 
@@ -109,6 +157,9 @@ class PID(Controller):
         # cache output for next update
         self.prev_output = output
 
+        if self.telemetry is not None:
+            self.telemetry.record(error, self.kp * error, self.ki * integral, self.kd * derivative, output)
+
         if debug:
             print(f"{output}: ({self.kp * error}, {self.ki * integral}, {self.kd * derivative})")
 
@@ -120,10 +171,21 @@ class PID(Controller):
         :rtype: bool
         """
         return self.times >= self.tolerance_count
+
+    def set_target(self, target: float):
+        """
+        Sets the setpoint, used to recover the measurement from the error when derivative_on_measurement is enabled
+
+        :param target: The target value of the system being controlled
+        :type target: float
+        """
+        self.setpoint = target
     
     def clear_history(self):
         self.prev_error = 0
         self.prev_integral = 0
         self.prev_output = 0
+        self.prev_derivative = 0
+        self.prev_measurement = None
         self.prev_time = None
         self.times = 0
\ No newline at end of file
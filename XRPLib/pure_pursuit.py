@@ -0,0 +1,153 @@
+from .drive_move import DriveMove
+from .timeout import Timeout
+from array import array
+import math
+
+class PurePursuit(DriveMove):
+
+    def __init__(self, drivetrain, waypoints: list, speed: float = 20, lookahead: float = 15, max_acceleration: float = 40, tolerance: float = 1, timeout: float = None):
+        """
+        Follows a path through (x, y) waypoints without stopping at each one, by steering along the arc to a point a fixed distance further along the path.
+        The path starts from where the robot is when the move is created, and positions come from the drivetrain's odometry.
+        The path is stored as arrays with the distance along it at each waypoint, and the robot's progress only ever moves forward,
+        so each update only looks at the next few segments.
+
+        :param drivetrain: The drivetrain to move
+        :type drivetrain: DifferentialDrive
+        :param waypoints: The points to drive through, in the odometry's frame (In Centimeters)
+        :type waypoints: list<tuple<float>>
+        :param speed: The cruising speed (In Centimeters per Second). Must be positive, since paths are always driven forwards
+        :type speed: float
+        :param lookahead: How far ahead along the path to steer towards (In Centimeters). Larger is smoother, smaller follows corners more tightly
+        :type lookahead: float
+        :param max_acceleration: How fast to slow down for the end of the path (In Centimeters per Second squared)
+        :type max_acceleration: float
+        :param tolerance: How close to the end of the path counts as finished (In Centimeters)
+        :type tolerance: float
+        :param timeout: The amount of time before the robot stops trying to follow the path (In Seconds).
+            If None, twice the time the path takes at the cruising speed, plus 5 seconds
+        :type timeout: float
+        """
+        if speed <= 0:
+            raise ValueError("Paths are followed forwards, so speed must be positive")
+        super().__init__(drivetrain, timeout)
+        if drivetrain.odometry is None:
+            drivetrain.start_odometry()
+        self.odometry = drivetrain.odometry
+        self.speed = speed
+        self.lookahead = lookahead
+        self.max_acceleration = max_acceleration
+        self.tolerance = tolerance
+
+        x, y, _ = self.odometry.get_pose_radians()
+        xs = [x]
+        ys = [y]
+        for point in waypoints:
+            # Zero-length segments have no direction to follow
+            if point[0] != xs[-1] or point[1] != ys[-1]:
+                xs.append(point[0])
+                ys.append(point[1])
+        distances = [0]
+        for i in range(1, len(xs)):
+            distances.append(distances[-1] + math.sqrt((xs[i] - xs[i - 1]) ** 2 + (ys[i] - ys[i - 1]) ** 2))
+        self._xs = array('f', xs)
+        self._ys = array('f', ys)
+        self._distances = array('f', distances)
+        self.length = distances[-1]
+        if timeout is None:
+            # Following can't always finish, e.g. if the robot is blocked, so there is always a limit
+            self._time_out = Timeout(2 * self.length / speed + 5)
+
+        # Segment the robot is closest to, and segment the lookahead point is on
+        self._closest = 0
+        self._target = 0
+        self.progress = 0
+
+    def get_lookahead_point(self) -> tuple:
+        """
+        :return: The point the robot is currently steering towards
+        :rtype: tuple<float>
+        """
+        return self._point_at(min(self.progress + self.lookahead, self.length))
+
+    def _step(self) -> bool:
+        if len(self._xs) < 2:
+            return True
+        x, y, theta = self.odometry.get_pose_radians()
+
+        self._update_progress(x, y)
+        remaining = self.length - self.progress
+        if remaining <= self.tolerance:
+            return True
+
+        target_x, target_y = self.get_lookahead_point()
+        dx = target_x - x
+        dy = target_y - y
+        # Sideways offset of the lookahead point from the robot, and the curvature of the arc through it
+        lateral = -math.sin(theta) * dx + math.cos(theta) * dy
+        forward = math.cos(theta) * dx + math.sin(theta) * dy
+
+        # Slow down so the robot can stop at the end of the path
+        speed = min(self.speed, math.sqrt(2 * self.max_acceleration * remaining))
+        if forward <= 0:
+            # No arc ahead of the robot reaches a point behind it, and driving on would only move away from the path,
+            # so turn in place towards the point first
+            turn_speed = speed / 2 if lateral >= 0 else -speed / 2
+            self.drivetrain.set_speed(-turn_speed, turn_speed)
+            return False
+
+        distance_squared = dx * dx + dy * dy
+        curvature = 2 * lateral / distance_squared
+        half_track = self.drivetrain.track_width / 2
+        self.drivetrain.set_speed(speed * (1 - curvature * half_track), speed * (1 + curvature * half_track))
+        return False
+
+    def _update_progress(self, x: float, y: float):
+        """
+        Non-api method; finds how far along the path the robot is, moving forward through the segments only
+        """
+        last = len(self._xs) - 2
+        closest = self._closest
+        t, distance = self._project(closest, x, y)
+        while closest < last:
+            next_t, next_distance = self._project(closest + 1, x, y)
+            if next_distance > distance:
+                break
+            closest += 1
+            t, distance = next_t, next_distance
+        self._closest = closest
+        progress = self._distances[closest] + t * (self._distances[closest + 1] - self._distances[closest])
+        if progress > self.progress:
+            self.progress = progress
+
+    def _project(self, segment: int, x: float, y: float) -> tuple:
+        """
+        Non-api method; finds the closest point on a segment to (x, y)
+
+        :return: how far along the segment that point is (0 to 1), and the squared distance to it
+        """
+        start_x = self._xs[segment]
+        start_y = self._ys[segment]
+        segment_x = self._xs[segment + 1] - start_x
+        segment_y = self._ys[segment + 1] - start_y
+        t = ((x - start_x) * segment_x + (y - start_y) * segment_y) / (segment_x * segment_x + segment_y * segment_y)
+        t = max(0, min(1, t))
+        offset_x = start_x + t * segment_x - x
+        offset_y = start_y + t * segment_y - y
+        return t, offset_x * offset_x + offset_y * offset_y
+
+    def _point_at(self, distance: float) -> tuple:
+        """
+        Non-api method; finds the point a given distance along the path. Distances must not decrease between calls
+        """
+        distances = self._distances
+        target = self._target
+        last = len(distances) - 2
+        while target < last and distances[target + 1] < distance:
+            target += 1
+        self._target = target
+        length = distances[target + 1] - distances[target]
+        t = (distance - distances[target]) / length if length > 0 else 1
+        t = max(0, min(1, t))
+        return (self._xs[target] + t * (self._xs[target + 1] - self._xs[target]),
+                self._ys[target] + t * (self._ys[target + 1] - self._ys[target]))
@@ -0,0 +1,80 @@
+from .drive_move import DriveMove
+from .trajectory import Trajectory
+import math
+import time
+
+class RamseteFollower(DriveMove):
+
+    def __init__(self, drivetrain, trajectory: Trajectory, b: float = 0.0002, zeta: float = 0.7, relative: bool = True, timeout: float = None):
+        """
+        Follows a precomputed Trajectory with the RAMSETE feedback law, which corrects position and heading error together
+        while feeding the trajectory's own velocities forward. Each update is a table lookup and a few multiplies.
+        Positions come from the drivetrain's odometry, and wheel speeds are commanded with set_speed.
+
+        :param drivetrain: The drivetrain to move
+        :type drivetrain: DifferentialDrive
+        :param trajectory: The trajectory to follow
+        :type trajectory: Trajectory
+        :param b: How aggressively to correct errors, in 1/cm^2. Larger converges faster (0.0002 is the usual 2 per square meter)
+        :type b: float
+        :param zeta: Damping of the correction, from 0 to 1
+        :type zeta: float
+        :param relative: If True, the trajectory starts from the robot's current pose. If False, it is in the odometry's frame
+        :type relative: bool
+        :param timeout: The amount of time before the robot stops trying to follow the trajectory (In Seconds)
+        :type timeout: float
+        """
+        super().__init__(drivetrain, timeout)
+        if drivetrain.odometry is None:
+            drivetrain.start_odometry()
+        self.odometry = drivetrain.odometry
+        self.trajectory = trajectory
+        self.b = b
+        self.zeta = zeta
+
+        # Transform from the odometry frame into the trajectory's frame, so that the table is used as stored
+        x, y, theta = self.odometry.get_pose_radians()
+        if relative:
+            start_x, start_y, start_theta = trajectory.sample(0)[:3]
+            self._rotation = start_theta - theta
+            cos_r = math.cos(self._rotation)
+            sin_r = math.sin(self._rotation)
+            self._offset_x = start_x - (cos_r * x - sin_r * y)
+            self._offset_y = start_y - (sin_r * x + cos_r * y)
+        else:
+            self._rotation = 0
+            self._offset_x = 0
+            self._offset_y = 0
+        self._cos_rotation = math.cos(self._rotation)
+        self._sin_rotation = math.sin(self._rotation)
+        self._start_time = time.ticks_ms()
+
+    def _step(self) -> bool:
+        t = time.ticks_diff(time.ticks_ms(), self._start_time) / 1000
+        if t > self.trajectory.get_duration():
+            return True
+        x_d, y_d, theta_d, v_d, omega_d, _ = self.trajectory.sample(self.trajectory.index_at(t))
+
+        x, y, theta = self.odometry.get_pose_radians()
+        cos_r = self._cos_rotation
+        sin_r = self._sin_rotation
+        x, y = cos_r * x - sin_r * y + self._offset_x, sin_r * x + cos_r * y + self._offset_y
+        theta += self._rotation
+
+        # Error in the robot's frame
+        dx = x_d - x
+        dy = y_d - y
+        cos_t = math.cos(theta)
+        sin_t = math.sin(theta)
+        error_x = cos_t * dx + sin_t * dy
+        error_y = -sin_t * dx + cos_t * dy
+        error_theta = math.atan2(math.sin(theta_d - theta), math.cos(theta_d - theta))
+
+        k = 2 * self.zeta * math.sqrt(omega_d * omega_d + self.b * v_d * v_d)
+        sinc = math.sin(error_theta) / error_theta if abs(error_theta) > 1e-6 else 1
+        velocity = v_d * math.cos(error_theta) + k * error_x
+        omega = omega_d + k * error_theta + self.b * v_d * sinc * error_y
+
+        half_track = self.drivetrain.track_width / 2
+        self.drivetrain.set_speed(velocity - omega * half_track, velocity + omega * half_track)
+        return False
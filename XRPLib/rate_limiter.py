@@ -0,0 +1,110 @@
+import uasyncio as asyncio
+import time
+
+class RateLimiter:
+
+    def __init__(self, rate: float = 100):
+        """
+        Paces a loop at a fixed rate by sleeping until the next deadline, rather than sleeping a fixed time after the loop's work,
+        so the period doesn't grow with the time the work takes. Deadlines are absolute, so the loop doesn't drift either.
+        Keeps statistics of the real loop period, for checking how much slack a loop has.
+
+        :param rate: How often the loop should run, in Hz
+        :type rate: float
+        """
+        self.period_us = round(1000000 / rate)
+        self.start()
+
+    def start(self):
+        """
+        Starts timing from now, and clears the statistics. Call this just before entering the loop
+        """
+        self._deadline = time.ticks_add(time.ticks_us(), self.period_us)
+        self._last_wake = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        """
+        Clears the loop period statistics
+        """
+        self.loops = 0
+        self.last_us = 0
+        self.min_us = 0
+        self.max_us = 0
+        self.total_us = 0
+        self.overruns = 0
+
+    def wait(self):
+        """
+        Sleeps until the next deadline. Call this once per loop
+        """
+        remaining = self._next_sleep()
+        if remaining > 0:
+            time.sleep_us(remaining)
+        self._record_wake()
+
+    async def wait_async(self):
+        """
+        Awaitable version of wait, which lets other asyncio tasks run until the next deadline.
+        Asyncio only wakes tasks to the millisecond, and only once the running task yields, so expect more jitter than wait
+        """
+        remaining = self._next_sleep()
+        await asyncio.sleep(remaining / 1000000 if remaining > 0 else 0)
+        self._record_wake()
+
+    def get_dt(self) -> float:
+        """
+        :return: The length of the last loop, in seconds, or the nominal period before the first loop has finished
+        :rtype: float
+        """
+        return (self.last_us if self.loops > 0 else self.period_us) / 1000000
+
+    def get_mean_us(self) -> float:
+        """
+        :return: The average loop period, in microseconds
+        :rtype: float
+        """
+        if self.loops == 0:
+            return 0
+        return self.total_us / self.loops
+
+    def print_stats(self, label: str = "Loop"):
+        """
+        Prints the loop period statistics
+
+        :param label: The name to print them under
+        :type label: str
+        """
+        print(f"{label}: target {self.period_us} us, min {self.min_us} us, mean {self.get_mean_us():.1f} us, "
+              f"max {self.max_us} us, over {self.loops} loops, overruns {self.overruns}")
+
+    def _next_sleep(self) -> int:
+        """
+        Non-api method; moves on to the next deadline
+
+        :return: How long to sleep until the current deadline, in microseconds
+        """
+        remaining = time.ticks_diff(self._deadline, time.ticks_us())
+        if remaining < 0:
+            self.overruns += 1
+            if remaining < -self.period_us:
+                # Too far behind to catch up; skip the missed deadlines rather than running a burst of loops
+                self._deadline = time.ticks_add(self._deadline, -remaining - remaining % self.period_us)
+        self._deadline = time.ticks_add(self._deadline, self.period_us)
+        return remaining
+
+    def _record_wake(self):
+        """
+        Non-api method; records the length of the loop that just finished
+        """
+        now = time.ticks_us()
+        if self._last_wake is not None:
+            period = time.ticks_diff(now, self._last_wake)
+            self.last_us = period
+            self.total_us += period
+            if self.loops == 0 or period < self.min_us:
+                self.min_us = period
+            if period > self.max_us:
+                self.max_us = period
+            self.loops += 1
+        self._last_wake = now
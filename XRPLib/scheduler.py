@@ -0,0 +1,216 @@
+from machine import Timer
+import time
+
+class ScheduledTask:
+
+    def __init__(self, callback, period_ms: int):
+        """
+        A periodic task registered with a Scheduler. Holds the timing statistics for that task.
+
+        :param callback: The function to call, with no arguments
+        :type callback: function
+        :param period_ms: How often to call it, in milliseconds
+        :type period_ms: int
+        """
+        self.callback = callback
+        self.period_ms = period_ms
+        # Number of scheduler ticks between each run, set by the scheduler
+        self.divider = 1
+        self.reset_stats()
+
+    def reset_stats(self):
+        """
+        Clears the timing statistics for this task
+        """
+        self.runs = 0
+        self.last_us = 0
+        self.max_us = 0
+        self.total_us = 0
+        self.overruns = 0
+        # Exceptions raised by the callback are caught, so that they don't stop the other tasks
+        self.errors = 0
+        self.last_error = None
+
+    def get_mean_us(self) -> float:
+        """
+        :return: The average execution time of this task, in microseconds
+        :rtype: float
+        """
+        if self.runs == 0:
+            return 0
+        return self.total_us / self.runs
+
+
+class Scheduler:
+
+    _DEFAULT_SCHEDULER_INSTANCE = None
+
+    @classmethod
+    def get_default_scheduler(cls):
+        """
+        Get the default scheduler instance. This is a singleton, so only one instance of the scheduler will ever exist.
+        All of the XRPLib periodic updates (motor speed control, IMU integration, LED blinking) run on this scheduler.
+        """
+        if cls._DEFAULT_SCHEDULER_INSTANCE is None:
+            cls._DEFAULT_SCHEDULER_INSTANCE = cls()
+        return cls._DEFAULT_SCHEDULER_INSTANCE
+
+    def __init__(self):
+        """
+        Runs periodic tasks from one shared virtual timer, instead of each task having its own timer.
+        The timer ticks at the greatest common divisor of all task periods, and tasks run one after another,
+        in the order they were added, inside that one callback. Tasks that share a period always sample at the same tick.
+        """
+        # A timer ID of -1 is a virtual timer.
+        # Leaves the hardware timers for more important uses
+        self._timer = Timer(-1)
+        # Replaced as a whole (never modified in place) so the callback always sees a consistent set
+        self._tasks = ()
+        self._period_ms = 0
+        self._tick = 0
+        self._tick_wrap = 1
+        self._last_tick_time = None
+        # Counts calls to _restart, so that _run can tell if a task restarted the scheduler
+        self._restarts = 0
+        self.reset_stats()
+
+    def add_task(self, callback, period_ms: int) -> ScheduledTask:
+        """
+        Registers a function to be called periodically. Tasks run in the order they are added.
+
+        :param callback: The function to call, with no arguments
+        :type callback: function
+        :param period_ms: How often to call it, in milliseconds
+        :type period_ms: int
+        :return: The task, which can be used to check its timing or to remove it later
+        :rtype: ScheduledTask
+        """
+        task = ScheduledTask(callback, max(1, int(period_ms)))
+        self._tasks = self._tasks + (task,)
+        self._restart()
+        return task
+
+    def remove_task(self, task: ScheduledTask):
+        """
+        Stops a task from being called. Does nothing if the task isn't registered.
+
+        :param task: The task returned by add_task
+        :type task: ScheduledTask
+        """
+        self._tasks = tuple(t for t in self._tasks if t is not task)
+        self._restart()
+
+    def set_task_period(self, task: ScheduledTask, period_ms: int):
+        """
+        Changes how often a task is called
+
+        :param task: The task returned by add_task
+        :type task: ScheduledTask
+        :param period_ms: How often to call it, in milliseconds
+        :type period_ms: int
+        """
+        task.period_ms = max(1, int(period_ms))
+        task.reset_stats()
+        self._restart()
+
+    def get_period(self) -> int:
+        """
+        :return: The period the scheduler is currently ticking at, in milliseconds. 0 if no tasks are registered.
+        :rtype: int
+        """
+        return self._period_ms
+
+    def get_tasks(self) -> tuple:
+        """
+        :return: All of the tasks currently registered, in the order they run
+        :rtype: tuple<ScheduledTask>
+        """
+        return self._tasks
+
+    def reset_stats(self):
+        """
+        Clears the timing statistics of the scheduler and all of its tasks
+        """
+        self.tick_overruns = 0
+        for task in self._tasks:
+            task.reset_stats()
+
+    def print_stats(self):
+        """
+        Prints the execution time, overrun and error counts of each task
+        """
+        print(f"Scheduler period: {self._period_ms} ms, tick overruns: {self.tick_overruns}")
+        for task in self._tasks:
+            print(f"  {task.callback}: every {task.period_ms} ms, last {task.last_us} us, "
+                  f"mean {task.get_mean_us():.1f} us, max {task.max_us} us, overruns {task.overruns}, "
+                  f"errors {task.errors}")
+            if task.last_error is not None:
+                print(f"    last error: {task.last_error!r}")
+
+    def _restart(self):
+        """
+        Non-api method; recomputes the tick period and task dividers, then restarts the timer
+        """
+        self._timer.deinit()
+        self._restarts += 1
+        if len(self._tasks) == 0:
+            self._period_ms = 0
+            return
+        period = 0
+        for task in self._tasks:
+            period = self._gcd(period, task.period_ms)
+        # The tick counter wraps at the least common multiple of the dividers, so every task stays in phase
+        tick_wrap = 1
+        for task in self._tasks:
+            task.divider = task.period_ms // period
+            tick_wrap = tick_wrap * task.divider // self._gcd(tick_wrap, task.divider)
+        self._period_ms = period
+        self._tick_wrap = tick_wrap
+        self._tick = 0
+        self._last_tick_time = None
+        self._timer.init(period=period, mode=Timer.PERIODIC, callback=lambda t:self._run())
+
+    def _run(self):
+        """
+        Non-api method; runs every task that is due on this tick
+        """
+        start = time.ticks_us()
+        period_us = self._period_ms * 1000
+        # A tick that starts much later than expected means one was missed
+        if self._last_tick_time is not None and time.ticks_diff(start, self._last_tick_time) > period_us + period_us // 2:
+            self.tick_overruns += 1
+        self._last_tick_time = start
+
+        tick = self._tick
+        restarts = self._restarts
+        for task in self._tasks:
+            if tick % task.divider == 0:
+                task_start = time.ticks_us()
+                try:
+                    task.callback()
+                except Exception as e:
+                    task.errors += 1
+                    task.last_error = e
+                elapsed = time.ticks_diff(time.ticks_us(), task_start)
+                task.runs += 1
+                task.last_us = elapsed
+                task.total_us += elapsed
+                if elapsed > task.max_us:
+                    task.max_us = elapsed
+                if elapsed > task.period_ms * 1000:
+                    task.overruns += 1
+        # A task that adds or removes tasks restarts the tick count, which must not be overwritten
+        if self._restarts == restarts:
+            tick += 1
+            if tick >= self._tick_wrap:
+                tick = 0
+            self._tick = tick
+
+        if time.ticks_diff(time.ticks_us(), start) > period_us:
+            self.tick_overruns += 1
+
+    @staticmethod
+    def _gcd(a: int, b: int) -> int:
+        while b:
+            a, b = b, a % b
+        return a
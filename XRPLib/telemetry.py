@@ -0,0 +1,122 @@
+import micropython
+from micropython import const
+from array import array
+import time
+
+"""
+Records controller updates into a preallocated ring buffer
+"""
+
+# Values stored per update, after the timestamp
+_ERROR = const(0)
+_P = const(1)
+_I = const(2)
+_D = const(3)
+_OUTPUT = const(4)
+_FIELDS = const(5)
+
+class Telemetry:
+
+    def __init__(self, size: int = 500):
+        """
+        A circular buffer of controller updates, for capturing closed-loop behaviour at full rate.
+        Recording only stores into preallocated arrays, so it doesn't disturb loop timing the way printing does.
+        Attach it with set_telemetry on a controller, then dump it once the move is over.
+        When full, the oldest updates are overwritten.
+
+        :param size: The number of updates to keep
+        :type size: int
+        """
+        self.size = size
+        self._times = array('i', [0] * size)
+        self._data = array('f', [0] * (size * _FIELDS))
+        self._start_time = 0
+        self._index = 0
+        self._count = 0
+
+    @micropython.native
+    def record(self, error: float, p: float, i: float, d: float, output: float):
+        """
+        Records one controller update, timestamped in microseconds since the first update recorded after the last clear
+
+        :param error: The error passed to the controller
+        :type error: float
+        :param p: The proportional term
+        :type p: float
+        :param i: The integral term
+        :type i: float
+        :param d: The derivative term
+        :type d: float
+        :param output: The output of the controller
+        :type output: float
+        """
+        now = time.ticks_us()
+        if self._count == 0:
+            self._start_time = now
+        index = self._index
+        self._times[index] = time.ticks_diff(now, self._start_time)
+        base = index * _FIELDS
+        data = self._data
+        data[base + _ERROR] = error
+        data[base + _P] = p
+        data[base + _I] = i
+        data[base + _D] = d
+        data[base + _OUTPUT] = output
+        index += 1
+        if index == self.size:
+            index = 0
+        self._index = index
+        if self._count < self.size:
+            self._count += 1
+
+    def clear(self):
+        """
+        Empties the buffer
+        """
+        self._index = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def get_row(self, row: int) -> tuple:
+        """
+        :param row: The update to get, with 0 as the oldest update kept
+        :type row: int
+        :return: The time (in seconds), error, P, I and D terms, and output of that update
+        :rtype: tuple<float>
+        """
+        if row < 0 or row >= self._count:
+            raise Exception("Telemetry row out of range")
+        index = (self._index - self._count + row) % self.size
+        base = index * _FIELDS
+        data = self._data
+        return (self._times[index] / 1000000, data[base + _ERROR], data[base + _P], data[base + _I], data[base + _D], data[base + _OUTPUT])
+
+    def dump(self):
+        """
+        Prints every update kept as CSV over serial, oldest first
+        """
+        print("time,error,p,i,d,output")
+        for row in range(self._count):
+            print("%.6f,%f,%f,%f,%f,%f" % self.get_row(row))
+
+    def log_to_webserver(self, label: str = "Telemetry", rows: int = 20, webserver = None):
+        """
+        Shows the most recent updates on the webserver dashboard, through Webserver.log_data
+
+        :param label: The label to show the updates under
+        :type label: str
+        :param rows: How many of the most recent updates to show
+        :type rows: int
+        :param webserver: The webserver to log to. Defaults to the default webserver
+        :type webserver: Webserver
+        """
+        if webserver is None:
+            from .webserver import Webserver
+            webserver = Webserver.get_default_webserver()
+        first = max(0, self._count - rows)
+        lines = ["time,error,p,i,d,output"]
+        for row in range(first, self._count):
+            lines.append("%.3f,%.3f,%.3f,%.3f,%.3f,%.3f" % self.get_row(row))
+        webserver.log_data(label, "<br>".join(lines))
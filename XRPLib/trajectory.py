@@ -0,0 +1,235 @@
+from array import array
+import math
+import struct
+
+"""
+Time-parameterized drive trajectories, precomputed before a run
+"""
+
+# Values stored per sample
+_X = 0
+_Y = 1
+_THETA = 2
+_VELOCITY = 3
+_ANGULAR_VELOCITY = 4
+_CURVATURE = 5
+_FIELDS = 6
+
+# File header: magic, version, sample period, sample count
+_HEADER = "<4sHfI"
+_MAGIC = b"XTRJ"
+_VERSION = 1
+
+class Trajectory:
+
+    def __init__(self, data: array, dt: float):
+        """
+        A drive trajectory stored as a table of samples taken every dt seconds. Each sample holds the pose (x, y in cm, heading in radians),
+        the forward velocity (cm/s), the angular velocity (rad/s) and the curvature (1/cm).
+        Build one with from_waypoints (on the robot, or ahead of time on a computer), save it, and load it for the run,
+        so that following it only costs a table lookup.
+
+        :param data: The samples, one after another
+        :type data: array<float>
+        :param dt: The time between samples, in seconds
+        :type dt: float
+        """
+        self._data = data
+        self.dt = dt
+
+    @classmethod
+    def from_waypoints(cls, waypoints: list, max_speed: float = 30, max_acceleration: float = 40, track_width: float = None, dt: float = 0.02):
+        """
+        Builds a trajectory that passes smoothly through the waypoints, starting and ending at rest.
+        The path is a cubic spline; speed is limited so that the robot can accelerate into and brake out of every part of it,
+        and, given track_width, so that the outer wheel never goes faster than max_speed on curves.
+
+        :param waypoints: The points to drive through, as (x, y) in cm, or (x, y, heading) with heading in degrees to fix the direction there
+        :type waypoints: list<tuple<float>>
+        :param max_speed: The maximum speed (In Centimeters per Second)
+        :type max_speed: float
+        :param max_acceleration: The maximum acceleration and deceleration (In Centimeters per Second squared)
+        :type max_acceleration: float
+        :param track_width: The distance between the wheels (In Centimeters), to limit the outer wheel's speed on curves
+        :type track_width: float
+        :param dt: The time between samples, in seconds. Should match how often the trajectory will be followed
+        :type dt: float
+        :return: The trajectory
+        :rtype: Trajectory
+        """
+        if len(waypoints) < 2:
+            raise Exception("A trajectory needs at least two waypoints")
+        points = [(p[0], p[1]) for p in waypoints]
+        count = len(points)
+
+        # Catmull-Rom tangents, scaled by the chord length, unless a heading is given
+        tangents = []
+        for i in range(count):
+            previous = points[max(0, i - 1)]
+            following = points[min(count - 1, i + 1)]
+            chord = math.sqrt((following[0] - previous[0]) ** 2 + (following[1] - previous[1]) ** 2)
+            if i > 0 and i < count - 1:
+                chord /= 2
+            if len(waypoints[i]) > 2:
+                heading = math.radians(waypoints[i][2])
+                tangents.append((chord * math.cos(heading), chord * math.sin(heading)))
+            else:
+                scale = 0.5 if i > 0 and i < count - 1 else 1
+                tangents.append(((following[0] - previous[0]) * scale, (following[1] - previous[1]) * scale))
+
+        # Sample the spline densely, about every centimeter
+        xs, ys, thetas, curvatures, distances = [], [], [], [], []
+        distance = 0
+        theta_offset = 0
+        for segment in range(count - 1):
+            p0, p1 = points[segment], points[segment + 1]
+            m0, m1 = tangents[segment], tangents[segment + 1]
+            length = math.sqrt((p1[0] - p0[0]) ** 2 + (p1[1] - p0[1]) ** 2)
+            steps = max(2, math.ceil(length))
+            for step in range(0 if segment == 0 else 1, steps + 1):
+                u = step / steps
+                x, y, dx, dy, ddx, ddy = cls._hermite(p0, m0, p1, m1, u)
+                if xs:
+                    distance += math.sqrt((x - xs[-1]) ** 2 + (y - ys[-1]) ** 2)
+                speed_squared = dx * dx + dy * dy
+                theta = math.atan2(dy, dx) + theta_offset
+                # Keep heading continuous rather than wrapping at +/-pi
+                if thetas:
+                    while theta - thetas[-1] > math.pi:
+                        theta -= 2 * math.pi
+                        theta_offset -= 2 * math.pi
+                    while theta - thetas[-1] < -math.pi:
+                        theta += 2 * math.pi
+                        theta_offset += 2 * math.pi
+                xs.append(x)
+                ys.append(y)
+                thetas.append(theta)
+                curvatures.append((dx * ddy - dy * ddx) / (speed_squared ** 1.5) if speed_squared > 0 else 0)
+                distances.append(distance)
+
+        # Speed limits: curvature, then acceleration forwards and braking backwards
+        samples = len(xs)
+        velocities = []
+        for i in range(samples):
+            limit = max_speed
+            if track_width is not None:
+                limit = max_speed / (1 + abs(curvatures[i]) * track_width / 2)
+            velocities.append(limit)
+        velocities[0] = 0
+        velocities[-1] = 0
+        for i in range(1, samples):
+            step = distances[i] - distances[i - 1]
+            velocities[i] = min(velocities[i], math.sqrt(velocities[i - 1] ** 2 + 2 * max_acceleration * step))
+        for i in range(samples - 2, -1, -1):
+            step = distances[i + 1] - distances[i]
+            velocities[i] = min(velocities[i], math.sqrt(velocities[i + 1] ** 2 + 2 * max_acceleration * step))
+
+        # Time at each dense sample, assuming constant acceleration between them
+        times = [0]
+        for i in range(1, samples):
+            step = distances[i] - distances[i - 1]
+            average = (velocities[i] + velocities[i - 1]) / 2
+            times.append(times[-1] + (step / average if average > 0 else 0))
+
+        # Resample at fixed time steps
+        sample_count = math.ceil(times[-1] / dt) + 1
+        data = array('f', [0] * (sample_count * _FIELDS))
+        index = 0
+        for sample in range(sample_count):
+            t = min(sample * dt, times[-1])
+            while index < samples - 2 and times[index + 1] <= t:
+                index += 1
+            span = times[index + 1] - times[index]
+            f = (t - times[index]) / span if span > 0 else 0
+            base = sample * _FIELDS
+            velocity = velocities[index] + f * (velocities[index + 1] - velocities[index])
+            curvature = curvatures[index] + f * (curvatures[index + 1] - curvatures[index])
+            data[base + _X] = xs[index] + f * (xs[index + 1] - xs[index])
+            data[base + _Y] = ys[index] + f * (ys[index + 1] - ys[index])
+            data[base + _THETA] = thetas[index] + f * (thetas[index + 1] - thetas[index])
+            data[base + _VELOCITY] = velocity
+            data[base + _ANGULAR_VELOCITY] = velocity * curvature
+            data[base + _CURVATURE] = curvature
+        return cls(data, dt)
+
+    @staticmethod
+    def _hermite(p0, m0, p1, m1, u: float) -> tuple:
+        """
+        Non-api method; evaluates a cubic Hermite segment and its first two derivatives
+        """
+        u2 = u * u
+        u3 = u2 * u
+        h00, h10, h01, h11 = 2*u3 - 3*u2 + 1, u3 - 2*u2 + u, -2*u3 + 3*u2, u3 - u2
+        d00, d10, d01, d11 = 6*u2 - 6*u, 3*u2 - 4*u + 1, -6*u2 + 6*u, 3*u2 - 2*u
+        s00, s10, s01, s11 = 12*u - 6, 6*u - 4, -12*u + 6, 6*u - 2
+        return (
+            h00*p0[0] + h10*m0[0] + h01*p1[0] + h11*m1[0],
+            h00*p0[1] + h10*m0[1] + h01*p1[1] + h11*m1[1],
+            d00*p0[0] + d10*m0[0] + d01*p1[0] + d11*m1[0],
+            d00*p0[1] + d10*m0[1] + d01*p1[1] + d11*m1[1],
+            s00*p0[0] + s10*m0[0] + s01*p1[0] + s11*m1[0],
+            s00*p0[1] + s10*m0[1] + s01*p1[1] + s11*m1[1],
+        )
+
+    def __len__(self) -> int:
+        return len(self._data) // _FIELDS
+
+    def get_duration(self) -> float:
+        """
+        :return: How long the trajectory takes, in seconds
+        :rtype: float
+        """
+        return (len(self) - 1) * self.dt
+
+    def index_at(self, t: float) -> int:
+        """
+        :param t: The time since the start of the trajectory, in seconds
+        :type t: float
+        :return: The index of the sample at that time, held at the last sample once the trajectory is over
+        :rtype: int
+        """
+        index = int(t / self.dt)
+        if index < 0:
+            return 0
+        last = len(self) - 1
+        return last if index > last else index
+
+    def sample(self, index: int) -> tuple:
+        """
+        :param index: The index of the sample
+        :type index: int
+        :return: The x, y (In Centimeters), heading (In Radians), velocity (In Centimeters per Second), angular velocity (In Radians per Second) and curvature (In 1/Centimeters) of that sample
+        :rtype: tuple<float>
+        """
+        base = index * _FIELDS
+        data = self._data
+        return (data[base + _X], data[base + _Y], data[base + _THETA], data[base + _VELOCITY], data[base + _ANGULAR_VELOCITY], data[base + _CURVATURE])
+
+    def save(self, path: str):
+        """
+        Saves the trajectory as a compact binary file
+
+        :param path: The file to save to
+        :type path: str
+        """
+        with open(path, "wb") as file:
+            file.write(struct.pack(_HEADER, _MAGIC, _VERSION, self.dt, len(self)))
+            file.write(self._data)
+
+    @classmethod
+    def load(cls, path: str):
+        """
+        Loads a trajectory saved with save
+
+        :param path: The file to load from
+        :type path: str
+        :return: The trajectory
+        :rtype: Trajectory
+        """
+        with open(path, "rb") as file:
+            magic, version, dt, count = struct.unpack(_HEADER, file.read(struct.calcsize(_HEADER)))
+            if magic != _MAGIC or version != _VERSION:
+                raise Exception("Not a trajectory file: " + path)
+            data = array('f', [0] * (count * _FIELDS))
+            file.readinto(data)
+        return cls(data, dt)
@@ -0,0 +1,151 @@
+from array import array
+
+"""
+Velocity estimators for smoothing the speed measured by an EncodedMotor.
+All of them keep their history in fixed-size buffers created up front, so nothing is allocated as they run.
+"""
+
+class VelocityEstimator:
+    """
+    An abstract class for estimating velocity from a series of encoder samples
+    """
+
+    def update(self, position: int, velocity: float, dt: float) -> float:
+        """
+        Handle a new encoder sample
+
+        :param position: The position of the encoder, in counts
+        :type position: int
+        :param velocity: The raw velocity measured over this update, in counts per second
+        :type velocity: float
+        :param dt: The time since the last sample, in seconds
+        :type dt: float
+
+        :return: The estimated velocity, in counts per second
+        :rtype: float
+        """
+        pass
+
+    def reset(self):
+        """
+        Clears all past samples
+        """
+        pass
+
+
+class EMAVelocityEstimator(VelocityEstimator):
+
+    def __init__(self, alpha: float = 0.3):
+        """
+        Exponential moving average of the raw velocity. Cheapest filter, but lags the most.
+
+        :param alpha: The weight given to each new sample, from 0 (ignore new samples) to 1 (no filtering)
+        :type alpha: float
+        """
+        self.alpha = alpha
+        self._state = array('f', [0])
+        self._has_sample = False
+
+    def update(self, position: int, velocity: float, dt: float) -> float:
+        state = self._state
+        if self._has_sample:
+            state[0] += self.alpha * (velocity - state[0])
+        else:
+            state[0] = velocity
+            self._has_sample = True
+        return state[0]
+
+    def reset(self):
+        self._state[0] = 0
+        self._has_sample = False
+
+
+class LeastSquaresVelocityEstimator(VelocityEstimator):
+
+    def __init__(self, window: int = 5):
+        """
+        Fits a straight line through the last few positions and returns its slope.
+        Smooths noise without the lag of an equivalent moving average, at the cost of a loop over the window each update.
+
+        :param window: The number of samples to fit over, at least 2
+        :type window: int
+        """
+        self.window = max(2, window)
+        # Ring buffer of positions, and of the time between each sample and the one before it
+        self._positions = array('i', [0] * self.window)
+        self._dts = array('f', [0] * self.window)
+        self._head = -1
+        self._count = 0
+
+    def update(self, position: int, velocity: float, dt: float) -> float:
+        window = self.window
+        head = (self._head + 1) % window
+        self._positions[head] = position
+        self._dts[head] = dt
+        self._head = head
+        if self._count < window:
+            self._count += 1
+        n = self._count
+        if n < 2:
+            return velocity
+
+        # Times and positions are taken relative to the newest sample, which keeps the sums small
+        sum_t = 0.0
+        sum_x = 0.0
+        sum_tt = 0.0
+        sum_tx = 0.0
+        t = 0.0
+        index = head
+        for _ in range(n):
+            x = self._positions[index] - position
+            sum_t += t
+            sum_x += x
+            sum_tt += t * t
+            sum_tx += t * x
+            t -= self._dts[index]
+            index = (index - 1) % window
+        denominator = n * sum_tt - sum_t * sum_t
+        if denominator == 0:
+            return velocity
+        return (n * sum_tx - sum_t * sum_x) / denominator
+
+    def reset(self):
+        self._head = -1
+        self._count = 0
+
+
+class AlphaBetaVelocityEstimator(VelocityEstimator):
+
+    def __init__(self, alpha: float = 0.5, beta: float = 0.1):
+        """
+        Tracks position and velocity together, correcting a constant-velocity prediction by the position error each update.
+        Responds to changes in speed faster than an EMA for the same amount of smoothing.
+
+        :param alpha: How much of the position error corrects the position estimate, from 0 to 1
+        :type alpha: float
+        :param beta: How much of the position error corrects the velocity estimate, from 0 to 2
+        :type beta: float
+        """
+        self.alpha = alpha
+        self.beta = beta
+        # Estimated position (counts) and velocity (counts per second)
+        self._state = array('f', [0, 0])
+        self._has_sample = False
+
+    def update(self, position: int, velocity: float, dt: float) -> float:
+        state = self._state
+        if not self._has_sample:
+            state[0] = position
+            state[1] = velocity
+            self._has_sample = True
+            return velocity
+        predicted = state[0] + state[1] * dt
+        residual = position - predicted
+        state[0] = predicted + self.alpha * residual
+        state[1] += self.beta * residual / dt
+        return state[1]
+
+    def reset(self):
+        self._state[0] = 0
+        self._state[1] = 0
+        self._has_sample = False
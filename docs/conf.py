@@ -42,6 +42,7 @@ autodoc_mock_imports = [
     'rp2',
     'phew',
     'gc',
+    'uasyncio',
     'uctypes']
 
 autodoc_preserve_defaults = True
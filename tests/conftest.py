@@ -0,0 +1,126 @@
+"""
+Runs XRPLib on a computer: the MicroPython-only modules are replaced with stand-ins, and time is simulated,
+so that drive code can be checked against simple wheel models without a robot.
+"""
+import asyncio
+import os
+import sys
+import time
+import types
+from unittest import mock
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_micropython = types.ModuleType("micropython")
+_micropython.const = lambda value: value
+_micropython.native = lambda function: function
+_micropython.viper = lambda function: function
+sys.modules.setdefault("micropython", _micropython)
+sys.modules.setdefault("machine", mock.MagicMock())
+sys.modules.setdefault("rp2", mock.MagicMock())
+sys.modules.setdefault("uasyncio", asyncio)
+
+from XRPLib.scheduler import Scheduler
+
+
+class FakeMotor:
+
+    def __init__(self, wheel, flip_dir: bool = False):
+        self._wheel = wheel
+        self.flip_dir = flip_dir
+        self.effort = 0
+
+    def set_effort(self, effort: float):
+        self.effort = max(-1, min(1, effort))
+
+
+class FakeEncoder:
+
+    resolution = 585
+
+    def __init__(self, wheel):
+        self._wheel = wheel
+        self._offset = 0
+
+    def get_position_counts(self) -> int:
+        counts = round(self._wheel.position) - self._offset
+        return -counts if self._wheel.motor.flip_dir else counts
+
+    def get_position(self) -> float:
+        return self.get_position_counts() / self.resolution
+
+    def reset_encoder_position(self):
+        self._offset = round(self._wheel.position)
+
+    def measures_period(self) -> bool:
+        return False
+
+
+class Wheel:
+
+    def __init__(self, flip_dir: bool = False, max_speed: float = 1700, time_constant: float = 0.08):
+        """
+        A motor, encoder and wheel whose speed (In Counts per Second) follows the effort with a first-order lag
+
+        :param max_speed: The speed at full effort
+        :param time_constant: How quickly the speed follows the effort, in seconds
+        """
+        self.motor = FakeMotor(self, flip_dir)
+        self.encoder = FakeEncoder(self)
+        self.max_speed = max_speed
+        self.time_constant = time_constant
+        self.speed = 0
+        self.position = 0
+
+    def step(self, dt: float):
+        self.speed += (self.motor.effort * self.max_speed - self.speed) * dt / self.time_constant
+        self.position += self.speed * dt
+
+
+class Simulation:
+
+    def __init__(self):
+        """
+        Simulated time, which moves the wheels and runs the default scheduler's tasks whenever the code under test sleeps
+        """
+        self.us = 0
+        self.wheels = []
+        self._next_tick_us = 0
+
+    def wheel(self, **kwargs) -> Wheel:
+        wheel = Wheel(**kwargs)
+        self.wheels.append(wheel)
+        return wheel
+
+    def sleep_us(self, us: int):
+        end = self.us + max(0, int(us))
+        while self.us < end:
+            step = min(1000, end - self.us)
+            for wheel in self.wheels:
+                wheel.step(step / 1000000)
+            self.us += step
+            scheduler = Scheduler.get_default_scheduler()
+            period_us = scheduler.get_period() * 1000
+            if period_us > 0 and self.us >= self._next_tick_us:
+                self._next_tick_us = self.us + period_us
+                scheduler._run()
+
+    def seconds(self) -> float:
+        return self.us / 1000000
+
+
+@pytest.fixture
+def sim(monkeypatch):
+    simulation = Simulation()
+    monkeypatch.setattr(Scheduler, "_DEFAULT_SCHEDULER_INSTANCE", None)
+    monkeypatch.setattr(time, "ticks_us", lambda: simulation.us, raising=False)
+    monkeypatch.setattr(time, "ticks_ms", lambda: simulation.us // 1000, raising=False)
+    monkeypatch.setattr(time, "ticks_diff", lambda a, b: a - b, raising=False)
+    monkeypatch.setattr(time, "ticks_add", lambda a, b: a + b, raising=False)
+    monkeypatch.setattr(time, "sleep_us", simulation.sleep_us, raising=False)
+    monkeypatch.setattr(time, "sleep_ms", lambda ms: simulation.sleep_us(ms * 1000), raising=False)
+    monkeypatch.setattr(time, "sleep", lambda s: simulation.sleep_us(s * 1000000))
+    monkeypatch.setattr(time, "time", simulation.seconds)
+    return simulation
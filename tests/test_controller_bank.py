@@ -0,0 +1,35 @@
+import pytest
+
+from XRPLib.controller_bank import ControllerBank
+from XRPLib.fast_pid import FastPID
+from XRPLib.pid import PID
+
+GAINS = dict(kp=0.5, ki=0.2, kd=0.05, min_output=0.1, max_output=0.8, max_integral=3, tolerance=0.5, tolerance_count=2)
+ERRORS = [4.0, 3.0, 1.5, 0.2, -0.3, 0.1, 0.0]
+
+
+def test_bank_matches_fast_pid_and_pid(sim):
+    bank = ControllerBank(3)
+    for channel in range(3):
+        bank.configure(channel, **GAINS)
+    fast = FastPID(**GAINS)
+    pid = PID(**GAINS)
+    for error in ERRORS:
+        for channel in range(3):
+            bank.errors[channel] = error
+        bank.update(0.02)
+        expected = pid.update(error, dt=0.02)
+        assert fast.update(error, 0.02) == pytest.approx(expected, abs=1e-5)
+        for channel in range(3):
+            assert bank.outputs[channel] == pytest.approx(expected, abs=1e-5)
+        assert bank.is_channel_done(0) == fast.is_done() == pid.is_done()
+
+
+def test_channel_adapter(sim):
+    bank = ControllerBank(2)
+    bank.configure(1, **GAINS)
+    channel = bank.channel(1)
+    pid = PID(**GAINS)
+    for error in ERRORS:
+        assert channel.update(error, dt=0.02) == pytest.approx(pid.update(error, dt=0.02), abs=1e-5)
+    assert bank.outputs[0] == 0
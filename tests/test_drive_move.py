@@ -0,0 +1,36 @@
+import math
+
+import pytest
+
+from XRPLib.differential_drive import DifferentialDrive
+from XRPLib.encoded_motor import EncodedMotor
+
+
+def make_drivetrain(sim):
+    left = sim.wheel(flip_dir=True)
+    right = sim.wheel()
+    return DifferentialDrive(EncodedMotor(left.motor, left.encoder), EncodedMotor(right.motor, right.encoder))
+
+
+def test_zero_radius_arc_is_rejected(sim):
+    drivetrain = make_drivetrain(sim)
+    with pytest.raises(ValueError):
+        drivetrain.start_arc(0, 90)
+    with pytest.raises(ValueError):
+        drivetrain.arc(0, 90)
+
+
+def test_arc_reaches_angle(sim):
+    drivetrain = make_drivetrain(sim)
+    assert drivetrain.arc(30, 90, timeout=10)
+    turned = (drivetrain.get_right_encoder_position() - drivetrain.get_left_encoder_position()) / drivetrain.track_width
+    assert abs(math.degrees(turned) - 90) < 3
+
+
+def test_moves_get_their_own_default_controllers(sim):
+    drivetrain = make_drivetrain(sim)
+    straight = drivetrain.start_straight(20, max_effort=0.5)
+    arc = drivetrain.start_arc(30, 90, max_effort=0.8)
+    assert straight.main_controller is not arc.main_controller
+    assert straight.secondary_controller is not arc.secondary_controller
+    assert straight.main_controller.max_output == 0.5
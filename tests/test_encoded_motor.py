@@ -0,0 +1,30 @@
+from XRPLib.controller import Controller
+from XRPLib.encoded_motor import EncodedMotor
+from XRPLib.feedforward import Feedforward
+
+
+class Proportional(Controller):
+
+    def __init__(self, kp: float):
+        self.kp = kp
+
+    def update(self, input):
+        return self.kp * input
+
+    def is_done(self) -> bool:
+        return False
+
+
+def test_speed_control_with_one_argument_controller(sim):
+    wheel = sim.wheel()
+    motor = EncodedMotor(wheel.motor, wheel.encoder)
+    motor.set_speed_controller(Feedforward(kV=1 / 1700, feedback=Proportional(0.002)))
+    motor.set_speed(60)
+    sim.sleep_us(1000000)
+    # About 12 counts per update at this speed, so one count is about 5 rpm
+    assert abs(wheel.speed * 60 / 585 - 60) < 1
+    assert abs(motor.get_speed() - 60) < 6
+
+    motor.set_speed_controller(Proportional(0.002))
+    sim.sleep_us(1000000)
+    assert motor.get_speed() > 30
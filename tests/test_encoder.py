@@ -0,0 +1,47 @@
+from unittest import mock
+
+import rp2
+
+from XRPLib.encoder import Encoder
+
+
+def state_machines(monkeypatch, period_error=None):
+    machines = {}
+
+    def state_machine(index, *args, **kwargs):
+        if index >= 4 and period_error is not None:
+            raise period_error
+        machines[index] = mock.MagicMock()
+        return machines[index]
+
+    monkeypatch.setattr(rp2, "StateMachine", state_machine)
+    return machines
+
+
+def test_falls_back_without_period_state_machine(sim, monkeypatch):
+    state_machines(monkeypatch, period_error=OSError(12))
+    encoder = Encoder(0, 4, 5)
+    assert not encoder.start_period_measurement(4)
+    assert not encoder.measures_period()
+    assert encoder.get_period_speed() == 0
+
+
+def test_period_speed_uses_time_of_edge(sim, monkeypatch):
+    machines = state_machines(monkeypatch)
+    encoder = Encoder(0, 4, 5)
+    assert encoder.start_period_measurement(4)
+    period_sm = machines[4]
+    on_edge = period_sm.irq.call_args[0][0]
+
+    def get(buffer):
+        buffer[0] = 5000
+
+    # An edge 10ms after the one before it, at 0.1s
+    sim.us = 100000
+    on_edge(period_sm)
+    period_sm.rx_fifo.return_value = 1
+    period_sm.get.side_effect = get
+
+    # Read 50ms after that edge, with no edge since, so the motor has slowed to at most 4 counts per 50ms
+    sim.us = 150000
+    assert abs(encoder.get_period_speed() - 80) < 1e-6
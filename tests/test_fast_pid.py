@@ -0,0 +1,23 @@
+from XRPLib.fast_pid import FastPID
+
+
+def test_unbounded_integral_stays_a_small_int():
+    controller = FastPID(kp=0.5, ki=0.1)
+    assert max(abs(value) for value in controller._fixed) < 2**30
+
+
+def test_fractional_tolerance_on_fixed_path():
+    controller = FastPID(kp=0.5, tolerance=0.1, tolerance_count=3)
+    for _ in range(3):
+        controller.update_fixed(1, 10000)
+    assert not controller.is_done()
+    for _ in range(3):
+        controller.update_fixed(0, 10000)
+    assert controller.is_done()
+
+
+def test_saturated_integral_term_stays_a_small_int():
+    controller = FastPID(kp=0.5, ki=2.0)
+    for _ in range(1000):
+        controller.update_fixed(50, 10000)
+    assert abs(controller._fixed[1] * controller._fixed[6]) < 2**30
@@ -0,0 +1,24 @@
+import pytest
+
+from XRPLib.gain_scheduled_controller import GainScheduledController
+
+
+def test_gains_interpolate_between_operating_points(sim):
+    controller = GainScheduledController([(1, 0.1, 0.01), (2, 0.2, 0.02), (4, 0.4, 0.04)], [0.2, 0.5, 1.0])
+    for point, kp in [(0.1, 1), (0.35, 1.5), (0.5, 2), (0.75, 3), (1.2, 4)]:
+        controller.set_operating_point(-point)
+        controller.update(1, dt=0.02)
+        assert controller.kp == pytest.approx(kp)
+        assert controller.ki == pytest.approx(kp / 10)
+        assert controller.kd == pytest.approx(kp / 100)
+
+
+def test_output_continuous_when_ki_changes(sim):
+    controller = GainScheduledController([(0, 1, 0), (0, 4, 0)], [0.2, 1.0], max_output=10)
+    controller.set_operating_point(0.2)
+    for _ in range(50):
+        before = controller.update(1, dt=0.02)
+    controller.set_operating_point(1.0)
+    after = controller.update(1, dt=0.02)
+    # Only the new step's share of the integral term changes the output
+    assert after == pytest.approx(before + 4 * 0.02)
@@ -0,0 +1,18 @@
+from XRPLib.differential_drive import DifferentialDrive
+from XRPLib.encoded_motor import EncodedMotor
+from XRPLib.motion_queue import MotionQueue
+
+
+def test_queue_reads_its_own_encoders(sim):
+    left = sim.wheel(flip_dir=True)
+    right = sim.wheel()
+    drivetrain = DifferentialDrive(EncodedMotor(left.motor, left.encoder), EncodedMotor(right.motor, right.encoder))
+    queue = MotionQueue(drivetrain)
+    queue.straight(20)
+    queue.straight(10)
+    assert queue.wait(timeout=10)
+    assert queue.segments_done == 2
+    assert abs(drivetrain.get_left_encoder_position() - 30) < 1
+    assert abs(drivetrain.get_right_encoder_position() - 30) < 1
+    # The drivetrain's own bank was never touched from the background loop
+    assert drivetrain._encoder_bank.timestamp_us == 0
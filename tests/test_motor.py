@@ -0,0 +1,18 @@
+from XRPLib.motor import Motor
+
+
+def test_flip_dir_change_rewrites_direction():
+    motor = Motor(6, 7)
+    motor.set_effort(0.5)
+    motor.flip_dir = True
+    motor.set_effort(0.5)
+    assert motor._dirPin.value.call_args_list[-1][0][0] == 1
+
+
+def test_no_minimum_pulse_by_default():
+    motor = Motor(6, 7, pwm_freq=20000)
+    motor.set_effort(0.001)
+    assert motor._speedPin.duty_u16.call_args[0][0] == int(0.001 * 65534)
+    motor = Motor(6, 7, pwm_freq=20000, min_pulse_ns=1000)
+    motor.set_effort(0.001)
+    assert motor._speedPin.duty_u16.call_args[0][0] > 1300
@@ -0,0 +1,96 @@
+from XRPLib.differential_drive import DifferentialDrive
+from XRPLib.encoded_motor import EncodedMotor
+from XRPLib.motion_profile import MotionProfile
+from XRPLib.motor_group import MotorGroup
+from XRPLib.pid import PID
+from XRPLib.velocity_estimator import LeastSquaresVelocityEstimator
+
+
+def make_group(sim, *max_speeds):
+    wheels = [sim.wheel(max_speed=max_speed, flip_dir=i % 2 == 1) for i, max_speed in enumerate(max_speeds)]
+    group = MotorGroup(*[EncodedMotor(wheel.motor, wheel.encoder) for wheel in wheels])
+    return group, wheels
+
+
+def test_is_done_when_idle(sim):
+    group, _ = make_group(sim, 1700, 1700)
+    assert group.is_done()
+
+
+def test_get_speed_raw(sim):
+    group, _ = make_group(sim, 1700, 1700)
+    group.set_effort(0.5)
+    sim.sleep_us(500000)
+    assert abs(group.get_speed(raw=True) - 850 * 60 / 585) < 5
+    assert group.get_speed() == group.get_speed(raw=True)
+
+
+def position_controller():
+    return PID(kp=2, kd=0.05, max_output=0.5, tolerance=0.05, tolerance_count=3)
+
+
+def test_set_position(sim):
+    group, wheels = make_group(sim, 1700, 1400)
+    group.set_position(2, controller=position_controller())
+    assert not group.is_done()
+    for _ in range(300):
+        sim.sleep_us(10000)
+        if group.is_done():
+            break
+    assert group.is_done()
+    assert abs(group.get_position() - 2) < 0.05
+    # Both members arrive, even though one is weaker
+    assert abs(wheels[0].position - wheels[1].position) < 0.1 * 585
+
+
+def test_follow_profile(sim):
+    group, wheels = make_group(sim, 1700, 1400)
+    profile = MotionProfile.trapezoidal(3, 1.5, 3)
+    group.follow_profile(profile, controller=PID(kp=300, max_output=60, tolerance=0.05, tolerance_count=3))
+    for _ in range(500):
+        sim.sleep_us(10000)
+        if group.is_done():
+            break
+    assert group.is_done()
+    assert abs(group.get_position() - 3) < 0.05
+    assert abs(wheels[0].position - wheels[1].position) < 0.1 * 585
+
+
+def test_profiled_moves_on_group_drivetrain(sim):
+    left, _ = make_group(sim, 1700, 1700)
+    right, _ = make_group(sim, 1700, 1700)
+    drivetrain = DifferentialDrive(left, right)
+    assert drivetrain.profiled_straight(20, timeout=5)
+    assert abs(drivetrain.get_left_encoder_position() - 20) < 0.5
+    assert abs(drivetrain.get_right_encoder_position() - 20) < 0.5
+    drivetrain.reset_encoder_position()
+    assert drivetrain.profiled_turn(90, timeout=5)
+    turn_cm = 15.5 * 3.141592653589793 / 4
+    assert abs(drivetrain.get_right_encoder_position() - turn_cm) < 0.5
+    assert abs(drivetrain.get_left_encoder_position() + turn_cm) < 0.5
+
+
+def test_members_change_while_running(sim):
+    group, wheels = make_group(sim, 1700, 1700)
+    motor = group.motors[1]
+    group.set_speed(60)
+    sim.sleep_us(100000)
+    group.remove_motor(motor)
+    sim.sleep_us(100000)
+    group.add_motor(motor)
+    sim.sleep_us(500000)
+    motors, signs, positions, start_positions = group._members
+    assert len(motors) == len(signs) == len(positions) == len(start_positions) == 2
+    # Still under speed control, with the members kept together
+    assert group.get_speed() > 30
+    assert abs(wheels[0].speed - wheels[1].speed) < 10
+
+
+def test_least_squares_estimator(sim):
+    # Three members, so the average position is rarely a whole number of counts
+    group, _ = make_group(sim, 1700, 1700, 1700)
+    group.set_velocity_estimator(LeastSquaresVelocityEstimator())
+    group.set_effort(0.5)
+    sim.sleep_us(500000)
+    assert group._update_task.errors == 0
+    assert abs(group.get_speed() - 850 * 60 / 585) < 2
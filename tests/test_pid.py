@@ -0,0 +1,31 @@
+import pytest
+
+from XRPLib.differential_drive import DifferentialDrive
+from XRPLib.encoded_motor import EncodedMotor
+from XRPLib.pid import PID
+
+
+def test_back_calculation_respects_max_integral(sim):
+    controller = PID(kp=1, ki=0.1, max_output=0.5, max_integral=2, anti_windup_gain=10)
+    for error in (5, 5, 5, -5, -5, -5):
+        controller.update(error, dt=0.02)
+        assert abs(controller.prev_integral) <= 2
+
+
+def straight_settle_time(sim, distance, max_effort, main_controller=None):
+    left = sim.wheel()
+    right = sim.wheel()
+    drivetrain = DifferentialDrive(EncodedMotor(left.motor, left.encoder), EncodedMotor(right.motor, right.encoder))
+    start = sim.seconds()
+    assert drivetrain.straight(distance, max_effort, timeout=10, main_controller=main_controller)
+    return sim.seconds() - start
+
+
+@pytest.mark.parametrize("distance, max_effort", [(50, 0.5), (20, 0.5), (10, 0.3), (100, 0.8)])
+def test_straight_settles_as_fast_as_plain_pid(sim, distance, max_effort):
+    # The controller straight() used before derivative-on-measurement, filtering and anti-windup were added
+    baseline = PID(kp=0.1, ki=0.04, kd=0.04, min_output=0.3, max_output=max_effort, max_integral=10, tolerance=0.25, tolerance_count=3)
+    baseline_time = straight_settle_time(sim, distance, max_effort, baseline)
+    sim.wheels.clear()
+    default_time = straight_settle_time(sim, distance, max_effort)
+    assert default_time <= baseline_time * 1.1
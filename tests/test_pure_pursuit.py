@@ -0,0 +1,44 @@
+import math
+
+import pytest
+
+from XRPLib.differential_drive import DifferentialDrive
+from XRPLib.encoded_motor import EncodedMotor
+
+
+def make_drivetrain(sim, max_speed=1700):
+    left = sim.wheel(max_speed=max_speed, flip_dir=True)
+    right = sim.wheel(max_speed=max_speed)
+    return DifferentialDrive(EncodedMotor(left.motor, left.encoder), EncodedMotor(right.motor, right.encoder))
+
+
+def distance_to(drivetrain, x, y):
+    pose_x, pose_y, _ = drivetrain.get_pose()
+    return math.sqrt((pose_x - x) ** 2 + (pose_y - y) ** 2)
+
+
+def test_follows_path_ahead(sim):
+    drivetrain = make_drivetrain(sim)
+    assert drivetrain.follow_path([(40, 0), (40, 40)])
+    assert distance_to(drivetrain, 40, 40) < 3
+
+
+def test_follows_path_behind(sim):
+    drivetrain = make_drivetrain(sim)
+    assert drivetrain.follow_path([(-40, 0)])
+    assert distance_to(drivetrain, -40, 0) < 3
+
+
+def test_gives_up_by_default(sim):
+    # Wheels that can't move never finish the path
+    drivetrain = make_drivetrain(sim, max_speed=0)
+    start = sim.seconds()
+    assert not drivetrain.follow_path([(40, 0)], speed=20)
+    assert sim.seconds() - start < 2 * 40 / 20 + 6
+
+
+def test_rejects_speed_that_is_not_positive(sim):
+    drivetrain = make_drivetrain(sim)
+    for speed in (0, -20):
+        with pytest.raises(ValueError):
+            drivetrain.follow_path([(40, 0)], speed=speed)
@@ -0,0 +1,35 @@
+from XRPLib.scheduler import Scheduler
+
+
+def test_task_added_during_tick_starts_in_phase(sim):
+    scheduler = Scheduler.get_default_scheduler()
+    runs = []
+    added = []
+
+    def add_once():
+        if not added:
+            added.append(scheduler.add_task(lambda: runs.append(scheduler._tick), 20))
+
+    scheduler.add_task(add_once, 10)
+    scheduler._run()
+    # Adding a task restarted the tick count, so the new task runs on the very next tick
+    scheduler._run()
+    assert runs == [0]
+
+
+def test_raising_task_does_not_stop_others(sim):
+    scheduler = Scheduler.get_default_scheduler()
+    error = ValueError("broken")
+    runs = []
+
+    def broken():
+        raise error
+
+    failing = scheduler.add_task(broken, 10)
+    scheduler.add_task(lambda: runs.append(1), 10)
+    scheduler._run()
+    scheduler._run()
+    assert runs == [1, 1]
+    assert failing.errors == 2
+    assert failing.last_error is error
+    assert failing.runs == 2